@@ -0,0 +1,201 @@
+"""
+Erzeugt synthetische ProTime-Exporte für die Benchmarks.
+
+    python benchmarks/generate.py export.xlsx --rows 50000 --years 2
+    python benchmarks/generate.py exports --employees 20 --rows 5000
+
+Ist das Ziel keine .xlsx-Datei, entsteht dort ein Export je Mitarbeiter
+(z. B. als Eingabe für dash_app/batch.py).
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Projektnamen für Kurztext und Positionsbezeichnung
+_NAMES = [
+    "Alpha",
+    "Beta",
+    "Gamma",
+    "Delta",
+    "Epsilon",
+    "Zeta",
+    "Eta",
+    "Theta",
+    "Iota",
+    "Kappa",
+    "Lambda",
+    "Omikron",
+    "Sigma",
+    "Tau",
+    "Omega",
+]
+
+# Leistungen auf Projektbuchungen und ihre Anteile
+_LEISTUNGEN = ["Stunde", "Stunde Remote", "Nichtfakturierte Stunde", "Reisezeit"]
+_LEISTUNG_SHARES = [0.55, 0.25, 0.15, 0.05]
+
+GENERAL_KURZTEXT = "Stunden - CONET Solutions GmbH"
+
+
+def _projects(count):
+    """
+    Projekte als (Kostenstelle, Kurztext): etwa zwei Drittel Faktura-Projekte
+    (K…, X…), der Rest interne Projekte (I…).
+    """
+    projects = []
+    for i in range(count):
+        name = f"Projekt {_NAMES[i % len(_NAMES)]}" + (
+            f" {i // len(_NAMES) + 1}" if i >= len(_NAMES) else ""
+        )
+        prefix = "KX"[i % 2] if i % 3 != 2 else "I"
+        projects.append((f"{prefix}{1000 + i}", name))
+    return projects
+
+
+def generate_export(
+    rows=10_000,
+    employee=1,
+    years=1,
+    projects=8,
+    absence_share=0.05,
+    krank_share=0.3,
+    general_share=0.05,
+    start="2024-04-01",
+    seed=0,
+):
+    """
+    Liefert einen ProTime-Export des Mitarbeiters `employee` mit `rows`
+    Buchungen über `years` Jahre ab `start` als DataFrame. Wie ein echter
+    Export gehört er zu einem Mitarbeiter, das Dashboard wertet alle Zeilen
+    als dessen Buchungen aus (mehrere Mitarbeiter: generate_exports).
+
+    - absence_share: Anteil der Abwesenheitstage (8 h, Positionsbezeichnung
+      "Urlaub" bzw. zum Anteil krank_share "Krank")
+    - general_share: Anteil der "Stunden - CONET Solutions GmbH"-Buchungen mit
+      ein bis drei kommaseparierten Projekten in der Positionsbezeichnung
+    Buchungen fallen nur auf Werktage (Mo–Fr) und sind nach Datum sortiert.
+    """
+    rng = np.random.default_rng(seed)
+    project_list = _projects(projects)
+    codes = np.array([code for code, _ in project_list], dtype=object)
+    names = np.array([name for _, name in project_list], dtype=object)
+
+    first = np.datetime64(pd.Timestamp(start).date(), "D")
+    last = np.datetime64((pd.Timestamp(start) + pd.DateOffset(years=years)).date(), "D")
+    days = np.arange(first, last, dtype="datetime64[D]")
+    days = days[np.is_busday(days)]
+
+    dates = np.sort(rng.choice(days, size=rows))
+    kind = rng.choice(
+        3,
+        size=rows,
+        p=[1 - absence_share - general_share, absence_share, general_share],
+    )
+    project = rng.integers(0, len(project_list), size=rows)
+
+    df = pd.DataFrame(
+        {
+            "Mitarbeiter": str(employee),
+            "ProTime-Datum": dates.astype("datetime64[ns]"),
+            "Erfasste Menge": rng.integers(1, 33, size=rows) / 4,
+            "Auftrag/Projekt/Kst.": codes[project],
+            "Kurztext": names[project],
+            "Leistung": rng.choice(_LEISTUNGEN, size=rows, p=_LEISTUNG_SHARES).astype(
+                object
+            ),
+            "Positionsbezeichnung": rng.choice(
+                ["Entwicklung", "Beratung", "Meeting", "Dokumentation"], size=rows
+            ).astype(object),
+        }
+    )
+
+    absence = kind == 1
+    df.loc[absence, "Erfasste Menge"] = 8.0
+    df.loc[absence, "Auftrag/Projekt/Kst."] = "A0001"
+    df.loc[absence, "Kurztext"] = "Abwesenheit"
+    df.loc[absence, "Leistung"] = "Abwesenheit"
+    df.loc[absence, "Positionsbezeichnung"] = np.where(
+        rng.random(absence.sum()) < krank_share, "Krank", "Urlaub"
+    )
+
+    general = kind == 2
+    n_general = int(general.sum())
+    count = rng.integers(1, 4, size=n_general)
+    picks = rng.permuted(np.tile(names, (n_general, 1)), axis=1)
+    df.loc[general, "Auftrag/Projekt/Kst."] = "K9999"
+    df.loc[general, "Kurztext"] = GENERAL_KURZTEXT
+    df.loc[general, "Leistung"] = "Stunde"
+    df.loc[general, "Positionsbezeichnung"] = [
+        ", ".join(row[:n]) for row, n in zip(picks, count)
+    ]
+    return df
+
+
+def generate_exports(employees=1, seed=0, **kwargs):
+    """
+    Liefert je Mitarbeiter 1..`employees` einen Export (siehe generate_export)
+    als Liste. Jeder Mitarbeiter bekommt einen eigenen Seed und damit eigene
+    Buchungen, Abwesenheiten und Allgemein-Stunden.
+    """
+    return [
+        generate_export(employee=employee, seed=seed + employee - 1, **kwargs)
+        for employee in range(1, employees + 1)
+    ]
+
+
+def write_exports(exports, output):
+    """
+    Schreibt die Exporte nach `output`: endet es auf .xlsx, genau einen Export
+    in diese Datei, sonst jeden als mitarbeiter-<n>.xlsx in das Verzeichnis
+    `output`. Liefert die Pfade.
+    """
+    if output.lower().endswith(".xlsx"):
+        if len(exports) != 1:
+            raise ValueError("Mehrere Exporte brauchen ein Verzeichnis als Ziel")
+        exports[0].to_excel(output, index=False)
+        return [output]
+    os.makedirs(output, exist_ok=True)
+    paths = []
+    for df in exports:
+        path = os.path.join(output, f"mitarbeiter-{df['Mitarbeiter'].iloc[0]}.xlsx")
+        df.to_excel(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "output",
+        help="Zieldatei (.xlsx) oder Verzeichnis für einen Export je Mitarbeiter",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=10_000, help="Zeilen je Mitarbeiter"
+    )
+    parser.add_argument("--employees", type=int, default=1)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--projects", type=int, default=8)
+    parser.add_argument("--absence-share", type=float, default=0.05)
+    parser.add_argument("--krank-share", type=float, default=0.3)
+    parser.add_argument("--general-share", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    exports = generate_exports(
+        employees=args.employees,
+        rows=args.rows,
+        years=args.years,
+        projects=args.projects,
+        absence_share=args.absence_share,
+        krank_share=args.krank_share,
+        general_share=args.general_share,
+        seed=args.seed,
+    )
+    write_exports(exports, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Benchmark-Suite: misst data.import_data, alle create_*-Funktionen der Charts und
+den kompletten Callback-Pfad für synthetische Exporte (siehe generate.py)
+verschiedener Größe und gibt die Zeiten als JSON aus. Mit --employees > 1
+zusätzlich batch.py über einen Export je Mitarbeiter.
+
+    python benchmarks/run.py --sizes 1000,10000,100000 --output bench.json
+"""
+
+import argparse
+import atexit
+import base64
+import contextlib
+import datetime
+import functools
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from dash import no_update
+
+from generate import generate_export, generate_exports, write_exports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASH_APP = os.path.join(ROOT, "dash_app")
+
+# Eigenes Cache-Verzeichnis, auch wenn FAKTURA_CACHE_DIR gesetzt ist:
+# clear_datasets() löscht darin alle Datasets, die eines laufenden Servers
+# dürfen es nie sein. Die übrigen Verzeichnisse liegen darunter.
+CACHE_DIR = tempfile.mkdtemp(prefix="faktura-benchmark-")
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+os.environ["FAKTURA_CACHE_DIR"] = CACHE_DIR
+for _name in ("FAKTURA_JOBS_DIR", "FAKTURA_PROFILE_DIR", "FAKTURA_METRICS_DIR"):
+    os.environ.pop(_name, None)
+# Charts im selben Prozess berechnen, damit clear_results() die Zwischenergebnisse
+# tatsächlich verwirft und die Phasen dem Callback zugeordnet werden
+os.environ.setdefault("FAKTURA_POOL_WORKERS", "0")
+sys.path.insert(0, DASH_APP)
+os.chdir(DASH_APP)  # layout.py liest ../config.json
+
+import app  # noqa: E402  (registriert alle Callbacks)
+import batch  # noqa: E402
+from charts.burndown_bar import processing as burndown  # noqa: E402
+from charts.faktura_gauge import processing as faktura_gauge  # noqa: E402
+from charts.overview_bar import processing as overview  # noqa: E402
+from charts.projects_bar import processing as projects  # noqa: E402
+from charts.ueberstunden_gauge import processing as ueberstunden  # noqa: E402
+from charts.verhaeltnis_pie import processing as verhaeltnis  # noqa: E402
+from common import charts, compute, data, ingest, store  # noqa: E402
+
+# Größer lässt sich ein Export nicht sinnvoll als .xlsx schreiben (Excel
+# erlaubt ~1 Mio. Zeilen); darüber beginnt der Callback-Pfad nach dem Upload
+EXCEL_MAX_ROWS = 100_000
+
+TARGET = 160
+
+
+def measure(func, repeat, setup=None):
+    """
+    Führt func `repeat`-mal aus (vorher jeweils setup) und liefert Minimum und
+    Median der Laufzeiten in Sekunden.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "repeat": repeat}
+
+
+def print_timing(rows, name, timing):
+    print(f"{rows:>10} {name:<50} {timing['min'] * 1000:10.1f} ms", file=sys.stderr)
+
+
+def clear_results():
+    compute.clear()
+    charts._figures.clear()
+
+
+def clear_datasets():
+    clear_results()
+    store._memory.clear()
+    shutil.rmtree(store._path(), ignore_errors=True)
+
+
+def server_callbacks():
+    """
+    Alle serverseitigen Callbacks der App als (Funktion, Argumente, Outputs).
+    """
+    for output, callback in app.app.callback_map.items():
+        if "callback" not in callback:
+            continue  # clientseitig
+        names = [
+            f'{dep["id"]}.{dep["property"]}'
+            for dep in callback["inputs"] + callback.get("state", [])
+        ]
+        outputs = output[2:-2].split("...") if output.startswith("..") else [output]
+        func = callback["callback"].__wrapped__
+        if (callback.get("long") or {}).get("progress"):
+            # Hintergrund-Callback: direkt im Prozess, ohne Fortschrittsanzeige
+            func = functools.partial(func, lambda value: None)
+        yield (
+            func,
+            names,
+            [name.split("@")[0] for name in outputs],
+        )
+
+
+def run_callbacks(values):
+    """
+    Ruft alle Callbacks auf, deren Inputs in `values` vorliegen, in
+    Abhängigkeitsreihenfolge (wie nach einem Upload im Browser).
+    """
+    pending = list(server_callbacks())
+    while True:
+        ready = [cb for cb in pending if all(name in values for name in cb[1])]
+        if not ready:
+            return values
+        for cb in ready:
+            func, names, outputs = cb
+            result = func(*[values[name] for name in names])
+            values.update(
+                (name, value)
+                for name, value in zip(
+                    outputs, [result] if len(outputs) == 1 else result
+                )
+                if value is not no_update
+            )
+            pending.remove(cb)
+
+
+def bench_size(rows, repeat, generator_args):
+    results = []
+
+    def record(name, timing):
+        results.append({"name": name, "rows": rows, **timing})
+        print_timing(rows, name, timing)
+
+    df = generate_export(rows=rows, **generator_args)
+    start_date = df["ProTime-Datum"].min().date().isoformat()
+    end_date = df["ProTime-Datum"].max().date().isoformat()
+
+    raw = None
+    if rows <= EXCEL_MAX_ROWS:
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        raw = buffer.getvalue()
+        record("ingest.read_export", measure(lambda: ingest.read_export(raw), repeat))
+        df = ingest.read_export(raw)
+
+    record("data.import_data", measure(lambda: data.import_data(df), repeat))
+
+    # Eingaben der Charts wie in den Callbacks, aber nicht mitgemessen
+    clear_datasets()
+    key = store.put_dataset(
+        store.dataset_key(raw or str(rows).encode()), data.import_data(df)
+    )
+    # Dataset aus den Arrow-Dateien, wie in einem Worker ohne eigene Kopie
+    record(
+        "store.get_dataset",
+        measure(lambda: store.get_dataset(key), repeat, setup=store._memory.clear),
+    )
+    dataset = store.get_dataset(key)
+    faktura_totals = compute.project_totals(key, start_date, end_date, faktura=True)
+    all_totals = compute.project_totals(key, start_date, end_date)
+    calendar = compute.calendar(key, start_date, end_date)
+    fy_days = compute.fiscal_year_available_days(key, start_date)
+    remaining = compute.remaining_available_days(key, start_date, end_date)
+
+    chart_functions = {
+        "faktura_gauge.create_gauge_chart": lambda: faktura_gauge.create_gauge_chart(
+            faktura_totals, TARGET
+        ),
+        "faktura_gauge.create_daily_average_indicators": lambda: (
+            faktura_gauge.create_daily_average_indicators(
+                faktura_totals, remaining, "D", TARGET
+            )
+        ),
+        "projects_bar.create_project_bar_chart": lambda: projects.create_project_bar_chart(
+            faktura_totals
+        ),
+        "verhaeltnis_pie.create_verhaeltnis_pie_chart": lambda: (
+            verhaeltnis.create_verhaeltnis_pie_chart(all_totals)
+        ),
+        "overview_bar.create_interval_bar_chart": lambda: overview.create_interval_bar_chart(
+            dataset["daily"], start_date, end_date, "D"
+        ),
+        "burndown_bar.create_hours_burndown_chart": lambda: (
+            burndown.create_hours_burndown_chart(
+                dataset["daily"], calendar, fy_days, start_date, end_date, "D", TARGET
+            )
+        ),
+        "ueberstunden_gauge.create_verhaeltnis_chart": lambda: (
+            ueberstunden.create_verhaeltnis_chart(
+                dataset["daily"], start_date, end_date
+            )
+        ),
+    }
+    for name, func in chart_functions.items():
+        record(f"charts.{name}", measure(func, repeat))
+
+    def values():
+        return {
+            "update-date-range.n_clicks": 1,
+            "update-faktura-tage.n_clicks": 1,
+            "interval-dropdown.value": "D",
+            "date-picker-range.start_date": start_date,
+            "date-picker-range.end_date": end_date,
+            "faktura-tage.value": TARGET,
+            "session-id.data": None,
+        }
+
+    # Upload inklusive Base64-Dekodierung, Einlesen, Aufbereitung und Ablage
+    if raw is not None:
+        contents = (
+            "data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,"
+            + base64.b64encode(raw).decode()
+        )
+        record(
+            "callbacks.upload",
+            measure(
+                lambda: run_callbacks({"upload-data.contents": contents}),
+                repeat,
+                setup=clear_datasets,
+            ),
+        )
+
+    # Alle Charts nach einem Upload bzw. einer Änderung des Zeitraums
+    clear_datasets()
+    key = store.put_dataset(key, data.import_data(df))
+    record(
+        "callbacks.refresh_cold",
+        measure(
+            lambda: run_callbacks({**values(), "data-all.data": key}),
+            repeat,
+            setup=clear_results,
+        ),
+    )
+    record(
+        "callbacks.refresh_warm",
+        measure(lambda: run_callbacks({**values(), "data-all.data": key}), repeat),
+    )
+    return results
+
+
+def bench_batch(rows, employees, repeat, generator_args):
+    """
+    Misst batch.py über `employees` Exporte mit je `rows` Zeilen: Einlesen,
+    Aufbereitung und Kennzahlen, parallel über alle Kerne.
+    """
+    exports = generate_exports(employees, rows=rows, **generator_args)
+    start_date = exports[0]["ProTime-Datum"].min().date().isoformat()
+    end_date = exports[0]["ProTime-Datum"].max().date().isoformat()
+    with tempfile.TemporaryDirectory(prefix="faktura-batch-") as directory:
+        exports_dir = os.path.join(directory, "exports")
+        write_exports(exports, exports_dir)
+        argv = [
+            exports_dir,
+            "--output",
+            os.path.join(directory, "kpis"),
+            "--start",
+            start_date,
+            "--end",
+            end_date,
+        ]
+        # batch.py nennt die geschriebenen Dateien auf stdout, dort steht das JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            timing = measure(lambda: batch.main(argv), repeat)
+    print_timing(rows, f"batch.main ({employees} Exporte)", timing)
+    return {"name": "batch.main", "rows": rows, "employees": employees, **timing}
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000,1000000",
+        help="Zeilenzahlen, kommasepariert (bis 10000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--employees",
+        type=int,
+        default=1,
+        help="mit > 1 zusätzlich batch.py über so viele Exporte je Größe",
+    )
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--projects", type=int, default=8)
+    parser.add_argument("--absence-share", type=float, default=0.05)
+    parser.add_argument("--krank-share", type=float, default=0.3)
+    parser.add_argument("--general-share", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON-Datei, sonst stdout")
+    args = parser.parse_args()
+
+    generator_args = {
+        "years": args.years,
+        "projects": args.projects,
+        "absence_share": args.absence_share,
+        "krank_share": args.krank_share,
+        "general_share": args.general_share,
+        "seed": args.seed,
+    }
+    results = []
+    for rows in [int(size) for size in args.sizes.split(",")]:
+        results.extend(bench_size(rows, args.repeat, generator_args))
+        # batch.py liest .xlsx-Dateien, siehe EXCEL_MAX_ROWS
+        if args.employees > 1 and rows <= EXCEL_MAX_ROWS:
+            results.append(
+                bench_batch(rows, args.employees, args.repeat, generator_args)
+            )
+
+    report = {
+        "commit": _commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "generator": {**generator_args, "employees": args.employees},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
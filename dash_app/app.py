@@ -1,15 +1,33 @@
-from dash import Dash
-import layout
-import plotly.io as pio
+import importlib
+import logging
 
-from charts.faktura_gauge import callbacks as faktura_callbacks
-from charts.projects_bar import callbacks as projects_callbacks
-from charts.burndown_bar import callbacks as burndown_callbacks
-from charts.overview_bar import callbacks as overview_callbacks
-from charts.verhaeltnis_pie import callbacks as verhaeltnis_callbacks
-from charts.ueberstunden_gauge import callbacks as ueberstunden_callbacks
+from common import startup
 
-from interactions import callbacks as interaction_callbacks
+with startup.step("dash"):
+    from dash import Dash
+    import plotly.io as pio
+
+layout = startup.load("layout")
+api = startup.load("common.api")
+metrics = startup.load("common.metrics")
+profiling = startup.load("common.profiling")
+
+# Module mit register_callbacks(app); die Auswertung dahinter wird erst beim
+# ersten Aufruf eines Callbacks importiert
+CALLBACK_MODULES = (
+    "charts.faktura_gauge.callbacks",
+    "charts.projects_bar.callbacks",
+    "charts.burndown_bar.callbacks",
+    "charts.overview_bar.callbacks",
+    "charts.verhaeltnis_pie.callbacks",
+    "interactions.callbacks",
+    "charts.ueberstunden_gauge.callbacks",
+)
+
+# Meldungen der Module (z. B. Speicherbedarf hochgeladener Datasets) auf stderr
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
 
 external_scripts = [
     {"src": "https://cdn.tailwindcss.com"},
@@ -17,17 +35,17 @@ external_scripts = [
 
 pio.templates.default = "plotly_white"
 
-app = Dash(external_scripts=external_scripts)
+with startup.step("Dash-App und Layout"):
+    app = Dash(external_scripts=external_scripts)
+    app.layout = layout.serve_layout
 
-app.layout = layout.create_layout()
+for module_name in CALLBACK_MODULES:
+    with startup.step(module_name):
+        importlib.import_module(module_name).register_callbacks(app)
 
-faktura_callbacks.register_callbacks(app)
-projects_callbacks.register_callbacks(app)
-burndown_callbacks.register_callbacks(app)
-overview_callbacks.register_callbacks(app)
-verhaeltnis_callbacks.register_callbacks(app)
-interaction_callbacks.register_callbacks(app)
-ueberstunden_callbacks.register_callbacks(app)
+metrics.init_app(app)
+profiling.init_app(app)
+api.init_app(app)
 
 server = app.server
 
@@ -37,11 +55,23 @@ def healthz():
     return "OK", 200
 
 
+@server.route("/metrics")
+def prometheus_metrics():
+    return (
+        metrics.render(),
+        200,
+        {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+startup.print_report()
+
+
 if __name__ == "__main__":
     app.run_server(
         host="0.0.0.0",
         port=8050,
         debug=False,
         dev_tools_ui=False,
-        dev_tools_props_check=False
+        dev_tools_props_check=False,
     )
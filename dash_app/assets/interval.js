@@ -0,0 +1,156 @@
+/*
+ * Clientseitige Intervall-Umschaltung (Tag/Woche/Monat).
+ *
+ * Der Server liefert die Tages-Figures einmal in einen dcc.Store (siehe
+ * common/charts.interval_chart_data); beim Wechsel des Intervalls werden die
+ * Tageswerte hier im Browser auf Wochen bzw. Monate verdichtet, ohne
+ * Round-Trip zum Server.
+ */
+(function () {
+    // Umrechnung je Intervall (Tag, Woche, Monat) wie in faktura_gauge/processing.py
+    var CONVERSION = {D: [1, "Tag"], W: [5, "Woche"], ME: [22, "Monat"]};
+
+    function pad(n) {
+        return (n < 10 ? "0" : "") + n;
+    }
+
+    function isoDay(d) {
+        return d.getUTCFullYear() + "-" + pad(d.getUTCMonth() + 1) + "-" + pad(d.getUTCDate());
+    }
+
+    // Bucket eines Tages wie bei pandas: "W" = Sonntag der Woche, "ME" = Monatsende
+    function bucket(day, interval) {
+        var d = new Date(String(day).slice(0, 10) + "T00:00:00Z");
+        if (interval === "W") {
+            d.setUTCDate(d.getUTCDate() + (7 - d.getUTCDay()) % 7);
+        } else if (interval === "ME") {
+            d = new Date(Date.UTC(d.getUTCFullYear(), d.getUTCMonth() + 1, 0));
+        }
+        return isoDay(d);
+    }
+
+    // Verdichtet x/y auf das Intervall; how = "sum" oder "last" (x aufsteigend sortiert)
+    function resample(x, y, interval, how) {
+        var keys = [];
+        var values = {};
+        for (var i = 0; i < x.length; i++) {
+            var key = bucket(x[i], interval);
+            if (!(key in values)) {
+                keys.push(key);
+                values[key] = how === "sum" ? 0 : null;
+            }
+            if (how === "sum") {
+                values[key] += y[i] || 0;
+            } else if (y[i] !== null && y[i] !== undefined) {
+                values[key] = y[i];
+            }
+        }
+        keys.sort();
+        return {x: keys, y: keys.map(function (key) { return values[key]; })};
+    }
+
+    function copy(value) {
+        return JSON.parse(JSON.stringify(value));
+    }
+
+    function intervalBarFigure(payload, interval) {
+        var figure = copy(payload.figures[0]);
+        if (payload.empty || interval === "D") {
+            return figure;
+        }
+        figure.data.forEach(function (trace) {
+            var res = resample(trace.x || [], trace.y || [], interval, "sum");
+            trace.x = res.x;
+            trace.y = res.y;
+        });
+        return figure;
+    }
+
+    function burndownFigure(payload, interval) {
+        var figure = copy(payload.figures[0]);
+        if (payload.empty || interval === "D") {
+            return figure;
+        }
+        // Die Tagesbalken sind nach Tagesart auf mehrere Traces verteilt
+        var bars = [];
+        var data = [];
+        figure.data.forEach(function (trace) {
+            if (trace.type === "bar") {
+                for (var i = 0; i < trace.x.length; i++) {
+                    bars.push([String(trace.x[i]).slice(0, 10), trace.y[i]]);
+                }
+            } else {
+                var res = resample(trace.x || [], trace.y || [], interval, "last");
+                trace.x = res.x;
+                trace.y = res.y;
+                data.push(trace);
+            }
+        });
+        bars.sort(function (a, b) { return a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0; });
+        var res = resample(
+            bars.map(function (bar) { return bar[0]; }),
+            bars.map(function (bar) { return bar[1]; }),
+            interval,
+            "last"
+        );
+        data.unshift({
+            type: "bar",
+            x: res.x,
+            y: res.y,
+            name: "Kumulierte Faktura",
+            text: res.y,
+            marker: {color: "#1f77b4"},
+            opacity: 0.9,
+            textposition: "inside",
+            texttemplate: "%{y:.2f} PT"
+        });
+        figure.data = data;
+        figure.layout.title = Object.assign({}, figure.layout.title, {
+            text: "Kumulative Faktura & Ideallinie (" + interval + ")"
+        });
+        return figure;
+    }
+
+    function dailyAverageFigures(payload, interval) {
+        var figPt = copy(payload.figures[0]);
+        var figHours = copy(payload.figures[1]);
+        if (!payload.empty) {
+            var conversion = CONVERSION[interval] || CONVERSION.D;
+            var factor = conversion[0];
+            var label = conversion[1];
+            figPt.data[0].value = payload.daily_needed_pt * factor;
+            figPt.data[0].title.text = "Ø PT pro " + label + " (Rest)";
+            // 8 Stunden pro PT
+            figHours.data[0].value = payload.daily_needed_pt * 8 * factor;
+            figHours.data[0].title.text = "Ø Stunden pro " + label + " (Rest)";
+        }
+        return [figPt, figHours];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        faktura: {
+            bucket: bucket,
+            resample: resample,
+            interval_bar_figure: function (payload, interval) {
+                if (!payload) {
+                    return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+                }
+                return [intervalBarFigure(payload, interval), payload.config];
+            },
+            burndown_figure: function (payload, interval) {
+                if (!payload) {
+                    return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+                }
+                return [burndownFigure(payload, interval), payload.config];
+            },
+            daily_average_figures: function (payload, interval) {
+                if (!payload) {
+                    var no_update = window.dash_clientside.no_update;
+                    return [no_update, no_update, no_update, no_update];
+                }
+                var figures = dailyAverageFigures(payload, interval);
+                return [figures[0], payload.config, figures[1], payload.config];
+            }
+        }
+    });
+})();
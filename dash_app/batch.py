@@ -0,0 +1,126 @@
+"""
+Berechnet die Kennzahlen des Dashboards für viele ProTime-Exporte auf einmal,
+ohne Dash-Oberfläche, parallel über alle Kerne.
+
+    python batch.py ../exports --output ../kpis --start 2024-04-01 --end 2025-03-31
+
+Schreibt in das Ausgabeverzeichnis:
+  - kpis.csv:      eine Zeile je Export (siehe kpis.summary)
+  - projects.csv:  PT je Export, Projekt und Kurztext
+  - burndown.csv:  kumulierte Faktura und Ideallinie je Export und Tag
+bzw. .parquet mit --format parquet.
+"""
+
+import argparse
+import concurrent.futures
+import os
+import sys
+
+import pandas as pd
+
+from common import config, data, fiscal, ingest, kpis
+
+
+def process_export(path, start_date, end_date, faktura_target):
+    """
+    Liest einen Export ein und liefert (Kennzahlen, Projekte, Burndown) mit der
+    Spalte "export" (Dateiname ohne Endung).
+    """
+    with open(path, "rb") as file:
+        dataset = data.import_data(ingest.read_export(file.read()))
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    summary = {"export": name, "start_date": start_date, "end_date": end_date}
+    summary.update(kpis.summary(dataset, start_date, end_date, faktura_target))
+    df_projects = kpis.projects(dataset, start_date, end_date)
+    df_burndown = kpis.burndown_series(dataset, start_date, end_date, faktura_target)
+    df_projects.insert(0, "export", name)
+    df_burndown.insert(0, "export", name)
+    return summary, df_projects, df_burndown
+
+
+def find_exports(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith(".xlsx") and not name.startswith("~$")
+    )
+
+
+def write_table(df, directory, name, fmt):
+    path = os.path.join(directory, f"{name}.{fmt}")
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    fiscal_start, fiscal_end = fiscal.get_fiscal_year_range()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="Verzeichnis mit ProTime-Exporten (.xlsx)")
+    parser.add_argument("--output", default=".", help="Ausgabeverzeichnis")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--start", default=fiscal_start.isoformat())
+    parser.add_argument("--end", default=fiscal_end.isoformat())
+    parser.add_argument(
+        "--target",
+        type=float,
+        default=config.get("faktura_target", 160),
+        help="Zielvereinbarung in PT",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Anzahl Prozesse (Standard: alle Kerne)",
+    )
+    args = parser.parse_args(argv)
+
+    paths = find_exports(args.directory)
+    if not paths:
+        print(f"Keine Exporte in {args.directory}", file=sys.stderr)
+        return 1
+
+    summaries, projects, burndowns = [], [], []
+    failed = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(process_export, path, args.start, args.end, args.target): path
+            for path in paths
+        }
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                summary, df_projects, df_burndown = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: {e}", file=sys.stderr)
+                continue
+            summaries.append(summary)
+            projects.append(df_projects)
+            burndowns.append(df_burndown)
+
+    if summaries:
+        os.makedirs(args.output, exist_ok=True)
+        tables = {
+            "kpis": pd.DataFrame(summaries).sort_values("export", ignore_index=True),
+            "projects": pd.concat(projects, ignore_index=True).sort_values(
+                ["export", "project", "kurztext"], ignore_index=True
+            ),
+            "burndown": pd.concat(burndowns, ignore_index=True).sort_values(
+                ["export", "date"], ignore_index=True
+            ),
+        }
+        for name, df in tables.items():
+            print(write_table(df, args.output, name, args.format))
+
+    print(
+        f"{len(summaries)} Exporte ausgewertet, {failed} fehlgeschlagen",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
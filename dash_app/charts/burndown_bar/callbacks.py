@@ -1,34 +1,55 @@
-from io import StringIO
+from dash import ClientsideFunction, Output, Input, State
+from common import charts, store
 
-from dash import Output, Input, State
-from charts.burndown_bar import processing
-from common import charts
 
-import pandas as pd
+def build_burndown_data(key, start_date, end_date, faktura_target):
+    from charts.burndown_bar import processing
+    from common import compute
+
+    # Tageswerte; Woche/Monat werden im Browser aufgerollt (assets/interval.js)
+    figure, config = processing.create_hours_burndown_chart(
+        store.get_dataset(key)["daily"],
+        compute.calendar(key, start_date, end_date),
+        compute.fiscal_year_available_days(key, start_date),
+        start_date,
+        end_date,
+        "D",
+        faktura_target,
+    )
+    return charts.interval_chart_data([figure], config)
 
 
 def register_callbacks(app):
     @app.callback(
-        Output("hours-burndown-content", "figure"),
-        Output("hours-burndown-content", "config"),
+        Output("hours-burndown-data", "data"),
         Input("update-date-range", "n_clicks"),
         Input("update-faktura-tage", "n_clicks"),
-        Input("interval-dropdown", "value"),
         Input("data-all", "data"),
         State("date-picker-range", "start_date"),
         State("date-picker-range", "end_date"),
         State("faktura-tage", "value"),
+        State("session-id", "data"),
     )
-    def update_hours_burndown(
-        _, __, interval, data_all, start_date, end_date, faktura_tage
+    def update_hours_burndown_data(
+        _, __, data_all, start_date, end_date, faktura_tage, session
     ):
-        if not data_all or not data_all["faktura"] or not data_all["all"]:
-            return charts.empty_figure(), {}
-
-        df_faktura = pd.read_json(StringIO(data_all["faktura"]))
-        df_all = pd.read_json(StringIO(data_all["all"]))
+        if not store.has_dataset(data_all):
+            return charts.empty_interval_chart_data()
 
-        figure, config = processing.create_hours_burndown_chart(
-            df_faktura, df_all, start_date, end_date, interval, int(faktura_tage)
+        return charts.cached(
+            "hours-burndown",
+            build_burndown_data,
+            data_all,
+            start_date,
+            end_date,
+            int(faktura_tage),
+            session=session,
         )
-        return figure, config
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="faktura", function_name="burndown_figure"),
+        Output("hours-burndown-content", "figure"),
+        Output("hours-burndown-content", "config"),
+        Input("hours-burndown-data", "data"),
+        Input("interval-dropdown", "value"),
+    )
@@ -1,16 +1,18 @@
-import datetime
+import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
-import holidays
-from common import data
+from common import data, metrics
 
 
-def get_burndown_data(df_faktura, df_all, start_date, end_date, target=160):
+@metrics.timed("aggregate")
+def get_burndown_data(df_daily, calendar, start_date, end_date, target=160):
     """
     Berechnet:
-      - Die kumulative tatsächliche Faktura (in PT) basierend auf df_faktura.
+      - Die kumulative tatsächliche Faktura (in PT) basierend auf den
+        Faktura-Stunden im Tageswürfel df_daily.
       - Eine dynamisch berechnete Ideallinie (in PT), unter Berücksichtigung von
-        Feiertagen, Urlaub, Krankheit und Wochenenden.
+        Feiertagen, Urlaub, Krankheit und Wochenenden laut `calendar`
+        (siehe workdays.build_calendar für denselben Zeitraum).
       - Ein DataFrame (df_bar) mit zusätzlichen Informationen (Datum, Tagestyp,
         Farbe, Opacity, Gruppe) zur individuellen Formatierung der Balken im Chart.
     """
@@ -19,105 +21,47 @@ def get_burndown_data(df_faktura, df_all, start_date, end_date, target=160):
     all_days = pd.date_range(start=start_date, end=end_date, freq="D")
 
     # Tatsächliche Faktura berechnen (8 Stunden = 1 PT)
-    mask_fact = (df_faktura["ProTime-Datum"] >= start_date) & (
-            df_faktura["ProTime-Datum"] <= end_date
-    )
-    df_fact = df_faktura.loc[mask_fact].copy()
+    df_fact = data.slice_cube(df_daily, start_date, end_date, faktura=True).copy()
     df_fact["Erfasste Menge"] = df_fact["Erfasste Menge"] / 8.0
-    df_daily = df_fact.groupby(pd.Grouper(key="ProTime-Datum", freq="D"))[
+    fact_daily = df_fact.groupby(pd.Grouper(key="ProTime-Datum", freq="D"))[
         "Erfasste Menge"
     ].sum()
-    df_daily = df_daily.reindex(all_days, fill_value=0)
-    actual_cum = df_daily.cumsum()
-
-    # Abwesenheitstage (Urlaub und Krankheit)
-    absent_urlaub = set()
-    absent_krank = set()
-    if "Positionsbezeichnung" in df_all.columns:
-        vacation_rows = df_all.loc[
-            (df_all["Positionsbezeichnung"] == "Urlaub")
-            & (df_all["ProTime-Datum"] >= start_date)
-            & (df_all["ProTime-Datum"] <= end_date)
-            ]
-        absent_urlaub = set(vacation_rows["ProTime-Datum"].dt.normalize().dt.date)
-        krank_rows = df_all.loc[
-            (df_all["Positionsbezeichnung"] == "Krank")
-            & (df_all["ProTime-Datum"] >= start_date)
-            & (df_all["ProTime-Datum"] <= end_date)
-            ]
-        absent_krank = set(krank_rows["ProTime-Datum"].dt.normalize().dt.date)
-
-    # Feiertage in NRW bestimmen
-    years = list(range(start_date.year, end_date.year + 1))
-    nrw_holidays = holidays.Germany(prov="NW", years=years)
-    holiday_dates = set(nrw_holidays.keys())
-
-    # Verfügbare Arbeitstage bestimmen
-    available = []
-    for day in all_days:
-        day_date = day.date()
-        if (
-                (day.weekday() < 5)
-                and (day_date not in holiday_dates)
-                and (day_date not in absent_urlaub)
-                and (day_date not in absent_krank)
-        ):
-            available.append(True)
-        else:
-            available.append(False)
-
-    # Dynamische Ideallinie berechnen
-    ideal_values = []
-    cumulative = 0.0
-    remaining_target = float(target)
-    for i, day in enumerate(all_days):
-        if available[i]:
-            remaining_available = sum(available[i:])
-            daily_increment = (
-                remaining_target / remaining_available if remaining_available > 0 else 0
-            )
-            cumulative += daily_increment
-            remaining_target -= daily_increment
-        ideal_values.append(cumulative)
-
-    # Zusätzliche Daten für den Bar-Plot (z. B. zur individuellen Formatierung)
-    if not df_all.empty:
-        last_fact_date = df_all["ProTime-Datum"].max().date()
+    fact_daily = fact_daily.reindex(all_days, fill_value=0)
+    actual_cum = fact_daily.cumsum()
+
+    # Verfügbare Arbeitstage
+    available = calendar["available"].to_numpy()
+
+    # Dynamische Ideallinie berechnen: Das Restziel wird an jedem Arbeitstag
+    # gleichmäßig auf die ab dann noch verbleibenden Arbeitstage verteilt.
+    # Über die rückwärts kumulierten Arbeitstage ergibt sich daraus direkt der
+    # Stand der Ideallinie, ohne für jeden Tag den Rest erneut aufzusummieren.
+    remaining_available = np.cumsum(available[::-1])[::-1]
+    if len(remaining_available) and remaining_available[0] > 0:
+        remaining_after = remaining_available - available
+        ideal_values = float(target) * (1 - remaining_after / remaining_available[0])
     else:
-        last_fact_date = None
+        ideal_values = np.zeros(len(all_days))
+
+    # Für jeden Tag werden Tagestyp, Farbe, Opacity und Gruppe bestimmt
+    # (Reihenfolge der Bedingungen = Vorrang bei mehreren Tagesarten)
+    conditions = [
+        calendar["holiday"].to_numpy(),
+        calendar["urlaub"].to_numpy(),
+        calendar["krank"].to_numpy(),
+        calendar["weekend"].to_numpy(),
+    ]
+    day_types = np.select(
+        conditions, ["Feiertag", "Urlaub", "Krankheit", "Wochenende"], "normal"
+    )
+    colors = np.select(conditions, ["grey", "orange", "purple", "green"], "#1f77b4")
+    groups = np.where(day_types == "normal", "Arbeitstag", day_types)
+    opacities = np.where(day_types == "normal", 1, 0.6)
 
-    # Für jeden Tag werden Tagestyp, Farbe, Opacity und Gruppe bestimmt:
-    day_types = []
-    colors = []
-    opacities = []
-    groups = []
-    for day in all_days:
-        day_date = day.date()
-        if day_date in holiday_dates:
-            d_type = "Feiertag"
-            col = "grey"
-        elif day_date in absent_urlaub:
-            d_type = "Urlaub"
-            col = "orange"
-        elif day_date in absent_krank:
-            d_type = "Krankheit"
-            col = "purple"
-        elif day.weekday() >= 5:
-            d_type = "Wochenende"
-            col = "green"
-        else:
-            d_type = "normal"
-            col = "#1f77b4"
-        grp = "Arbeitstag" if d_type == "normal" else d_type
-        opac = 1
-        if d_type in ["Wochenende", "Feiertag", "Urlaub", "Krankheit"]:
-            opac = 0.6
-        if last_fact_date is not None and day_date > last_fact_date:
-            opac = 0.4
-        day_types.append(d_type)
-        colors.append(col)
-        opacities.append(opac)
-        groups.append(grp)
+    # Tage nach der letzten Buchung werden zusätzlich abgeschwächt
+    if not df_daily.empty:
+        last_fact_date = df_daily["ProTime-Datum"].max().normalize()
+        opacities = np.where(all_days > last_fact_date, 0.4, opacities)
 
     df_bar = pd.DataFrame(
         {
@@ -133,53 +77,41 @@ def get_burndown_data(df_faktura, df_all, start_date, end_date, target=160):
     return all_days, actual_cum, ideal_values, df_bar
 
 
-def get_fiscal_year_range_for(any_date):
+def get_dynamic_target(calendar, total_available_fy, faktura_target):
     """
-    Liefert das Geschäftsjahr (01.04.–31.03.), das `any_date`
-    enthält. akzeptiert str, Timestamp oder date.
+    Anteil der Zielvereinbarung (PT), der auf die verfügbaren Arbeitstage im
+    Zeitraum von `calendar` entfällt, gemessen an den verfügbaren Arbeitstagen
+    im Geschäftsjahr (total_available_fy, siehe
+    compute.fiscal_year_available_days).
     """
-    d = pd.to_datetime(any_date).date()
-    if d.month < 4:
-        return (datetime.date(d.year - 1, 4, 1),
-                datetime.date(d.year, 3, 31))
-    else:
-        return (datetime.date(d.year, 4, 1),
-                datetime.date(d.year + 1, 3, 31))
-
-
-def create_hours_burndown_chart(
-        df_fact, df_all, start_date, end_date, interval, faktura_target
-):
-    # ---------------------------------------------------------
-    #  0) Vorbereitungen
-    # ---------------------------------------------------------
-    df_fact["ProTime-Datum"] = pd.to_datetime(df_fact["ProTime-Datum"], unit="ms")
-    df_all["ProTime-Datum"] = pd.to_datetime(df_all["ProTime-Datum"], unit="ms")
-
-    # ---------------------------------------------------------
-    #  1) Arbeitstage im Geschäftsjahr, das zum Auswahl-Intervall gehört
-    # ---------------------------------------------------------
-    fy_start, fy_end = get_fiscal_year_range_for(start_date)  # ❶
-    total_available_fy = data.get_available_days(df_all, fy_start, fy_end)
     if total_available_fy == 0:
         total_available_fy = 1  # division-by-zero-safe
+    subrange_available = int(calendar["available"].sum())
+    daily_rate = faktura_target / total_available_fy
+    return daily_rate * subrange_available
 
-    # ---------------------------------------------------------
-    #  2) Arbeitstage im ausgewählten Teil-Intervall
-    # ---------------------------------------------------------
-    subrange_available = data.get_available_days(df_all, start_date, end_date)
 
+@metrics.timed("figure")
+def create_hours_burndown_chart(
+        df_daily,
+        calendar,
+        total_available_fy,
+        start_date,
+        end_date,
+        interval,
+        faktura_target,
+):
     # ---------------------------------------------------------
-    #  3) Dynamische Ziel-PT
+    #  1-3) Dynamische Ziel-PT: Anteil der Zielvereinbarung für die
+    #       verfügbaren Arbeitstage im ausgewählten Teil-Intervall
     # ---------------------------------------------------------
-    daily_rate = faktura_target / total_available_fy
-    dynamic_target = daily_rate * subrange_available
+    dynamic_target = get_dynamic_target(calendar, total_available_fy, faktura_target)
 
     # ---------------------------------------------------------
     #  4) Burndown-Daten (täglich)
     # ---------------------------------------------------------
     all_days, actual_cum, ideal_values, df_bar = get_burndown_data(
-        df_fact, df_all, start_date, end_date, target=dynamic_target
+        df_daily, calendar, start_date, end_date, target=dynamic_target
     )
 
     # ---------------------------------------------------------
@@ -1,10 +1,35 @@
-from io import StringIO
+import datetime
 
-from dash import Output, Input, State
-from common import data, charts
-from charts.faktura_gauge import processing
+from dash import ClientsideFunction, Output, Input, State
+from common import charts, store
 
-import pandas as pd
+
+def build_gauge_chart(key, start_date, end_date, faktura_target):
+    from charts.faktura_gauge import processing
+    from common import compute
+
+    df_grouped = compute.project_totals(key, start_date, end_date, faktura=True)
+    return processing.create_gauge_chart(df_grouped, faktura_target)
+
+
+def build_daily_average_data(key, start_date, end_date, faktura_target, _today):
+    from charts.faktura_gauge import processing
+    from common import compute
+
+    df_grouped = compute.project_totals(key, start_date, end_date, faktura=True)
+    remaining_days = compute.remaining_available_days(key, start_date, end_date)
+
+    # Werte pro Tag; Woche/Monat rechnet der Browser um (assets/interval.js)
+    fig_pt, config, fig_hours, _config = processing.create_daily_average_indicators(
+        df_grouped, remaining_days, "D", faktura_target
+    )
+    return charts.interval_chart_data(
+        [fig_pt, fig_hours],
+        config,
+        daily_needed_pt=processing.get_daily_needed_pt(
+            df_grouped, remaining_days, faktura_target
+        ),
+    )
 
 
 def register_callbacks(app):
@@ -17,41 +42,60 @@ def register_callbacks(app):
         State("date-picker-range", "start_date"),
         State("date-picker-range", "end_date"),
         State("faktura-tage", "value"),
+        State("session-id", "data"),
     )
-    def update_gauge_chart(_, __, data_all, start_date, end_date, faktura_tage):
-        if not data_all or not data_all["faktura"]:
+    def update_gauge_chart(
+        _, __, data_all, start_date, end_date, faktura_tage, session
+    ):
+        if not store.has_dataset(data_all):
             return charts.empty_figure(), {}
 
-        df_faktura = pd.read_json(StringIO(data_all["faktura"]))
-        df_grouped = data.filter_data_by_date(df_faktura, start_date, end_date)
-        figure, config = processing.create_gauge_chart(df_grouped, int(faktura_tage))
+        figure, config = charts.cached(
+            "faktura-total",
+            build_gauge_chart,
+            data_all,
+            start_date,
+            end_date,
+            int(faktura_tage),
+            session=session,
+        )
         return figure, config
 
     @app.callback(
-        Output("faktura-daily-avg-pt-content", "figure"),
-        Output("faktura-daily-avg-pt-content", "config"),
-        Output("faktura-daily-avg-hours-content", "figure"),
-        Output("faktura-daily-avg-hours-content", "config"),
+        Output("faktura-daily-avg-data", "data"),
         Input("update-date-range", "n_clicks"),
         Input("update-faktura-tage", "n_clicks"),
-        Input("interval-dropdown", "value"),
         Input("data-all", "data"),
         State("date-picker-range", "start_date"),
         State("date-picker-range", "end_date"),
         State("faktura-tage", "value"),
+        State("session-id", "data"),
     )
-    def update_daily_average(
-        _, __, interval, data_all, start_date, end_date, faktura_tage
+    def update_daily_average_data(
+        _, __, data_all, start_date, end_date, faktura_tage, session
     ):
-        if not data_all or not data_all["faktura"] or not data_all["all"]:
-            return charts.empty_figure(), {}, charts.empty_figure(), {}
+        if not store.has_dataset(data_all):
+            return charts.empty_interval_chart_data(2)
 
-        df_faktura = pd.read_json(StringIO(data_all["faktura"]))
-        df_all = pd.read_json(StringIO(data_all["all"]))
-
-        fig_pt, config_pt, fig_hours, config_hours = (
-            processing.create_daily_average_indicators(
-                df_faktura, df_all, start_date, end_date, interval, int(faktura_tage)
-            )
+        # Ohne Faktura-Buchung im Zeitraum wird ab heute gerechnet, daher
+        # gehört das Datum mit zum Schlüssel
+        return charts.cached(
+            "faktura-daily-avg",
+            build_daily_average_data,
+            data_all,
+            start_date,
+            end_date,
+            int(faktura_tage),
+            datetime.date.today().isoformat(),
+            session=session,
         )
-        return fig_pt, config_pt, fig_hours, config_hours
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="faktura", function_name="daily_average_figures"),
+        Output("faktura-daily-avg-pt-content", "figure"),
+        Output("faktura-daily-avg-pt-content", "config"),
+        Output("faktura-daily-avg-hours-content", "figure"),
+        Output("faktura-daily-avg-hours-content", "config"),
+        Input("faktura-daily-avg-data", "data"),
+        Input("interval-dropdown", "value"),
+    )
@@ -1,9 +1,9 @@
 import plotly.graph_objects as go
-import datetime
-import pandas as pd
-from common import data
 
+from common import metrics
 
+
+@metrics.timed("figure")
 def create_gauge_chart(df_grouped, faktura_target):
     """
     Erzeugt einen Gauge-Chart, der die kumulative Faktura (in PT) anzeigt.
@@ -27,50 +27,33 @@ def create_gauge_chart(df_grouped, faktura_target):
     return gauge_fig, config
 
 
-def create_daily_average_indicators(
-    df_faktura, df_all, start_date, end_date, interval, faktura_target
-):
+def get_daily_needed_pt(df_grouped, remaining_days, faktura_target):
     """
-    Erzeugt zwei Indikatoren:
-      - Ø PT pro Intervall (z.B. pro Tag, Woche oder Monat) (Rest zur Zielvorgabe)
-      - Ø Stunden pro Intervall (angenommen 8 Stunden pro PT)
+    Ø PT pro verfügbarem Arbeitstag, die bis zur Zielvorgabe noch fehlen.
     """
-    df_faktura["ProTime-Datum"] = pd.to_datetime(df_faktura["ProTime-Datum"], unit="ms")
-    df_all["ProTime-Datum"] = pd.to_datetime(df_all["ProTime-Datum"], unit="ms")
-    # Gruppiere die Faktura-Daten innerhalb des Datumsbereichs
-    df_grouped = data.filter_data_by_date(df_faktura, start_date, end_date)
-
-    # Filtere die ursprünglichen Faktura-Daten (ohne Gruppierung) zur Ermittlung des letzten Buchungstags
-    df_filtered = df_faktura[
-        (df_faktura["ProTime-Datum"] >= pd.to_datetime(start_date))
-        & (df_faktura["ProTime-Datum"] <= pd.to_datetime(end_date))
-    ]
-
     faktura_sum = df_grouped["Erfasste Menge"].sum()
     remaining_pt = faktura_target - faktura_sum
     if remaining_pt < 0:
         remaining_pt = 0
 
-    # Ermittle den letzten gebuchten Arbeitstag anhand der Spalte "ProTime-Datum"
-    if not df_filtered.empty:
-        letzter_buchungstag = pd.to_datetime(df_faktura["ProTime-Datum"]).max().date()
-    else:
-        letzter_buchungstag = datetime.date.today()
+    if remaining_days > 0:
+        return float(remaining_pt / remaining_days)
+    return 0
 
-    # Berechne die Anzahl verfügbarer Arbeitstage ab dem letzten gebuchten Arbeitstag bis zum Enddatum
-    end_date_date = pd.to_datetime(end_date).date()
 
-    if end_date_date < letzter_buchungstag:
-        remaining_days = 0
-    else:
-        remaining_days = data.get_available_days(
-            df_all, start_date=letzter_buchungstag, end_date=end_date_date
-        )
-
-    if remaining_days > 0:
-        daily_needed_pt = remaining_pt / remaining_days
-    else:
-        daily_needed_pt = 0
+@metrics.timed("figure")
+def create_daily_average_indicators(
+    df_grouped, remaining_days, interval, faktura_target
+):
+    """
+    Erzeugt zwei Indikatoren:
+      - Ø PT pro Intervall (z.B. pro Tag, Woche oder Monat) (Rest zur Zielvorgabe)
+      - Ø Stunden pro Intervall (angenommen 8 Stunden pro PT)
+    df_grouped enthält die Faktura-PT je Projekt im Zeitraum, remaining_days die
+    verfügbaren Arbeitstage ab dem letzten Buchungstag (siehe
+    compute.remaining_available_days).
+    """
+    daily_needed_pt = get_daily_needed_pt(df_grouped, remaining_days, faktura_target)
 
     # Umrechnung je Intervall (Tag, Woche, Monat)
     conversion = {"D": (1, "Tag"), "W": (5, "Woche"), "ME": (22, "Monat")}
@@ -1,33 +1,43 @@
-from io import StringIO
+from dash import ClientsideFunction, Output, Input, State
+from common import charts, store
 
-from dash import Output, Input, State
-from charts.overview_bar import processing
-from common import charts
-import pandas as pd
+
+def build_interval_bar_data(key, start_date, end_date):
+    from charts.overview_bar import processing
+
+    # Tageswerte; Woche/Monat werden im Browser aufgerollt (assets/interval.js)
+    figure, config = processing.create_interval_bar_chart(
+        store.get_dataset(key)["daily"], start_date, end_date, "D"
+    )
+    return charts.interval_chart_data([figure], config)
 
 
 def register_callbacks(app):
     @app.callback(
-        Output("interval-bar-chart", "figure"),
-        Output("interval-bar-chart", "config"),
+        Output("interval-bar-data", "data"),
         Input("update-date-range", "n_clicks"),
-        Input("interval-dropdown", "value"),
         Input("data-all", "data"),
         State("date-picker-range", "start_date"),
         State("date-picker-range", "end_date"),
+        State("session-id", "data"),
     )
-    def update_interval_bar_chart(
-        _,
-        interval,
-        data_all,
-        start_date,
-        end_date,
-    ):
-        if not data_all or not data_all["all"]:
-            return charts.empty_figure(), {}
+    def update_interval_bar_data(_, data_all, start_date, end_date, session):
+        if not store.has_dataset(data_all):
+            return charts.empty_interval_chart_data()
 
-        df_all = pd.read_json(StringIO(data_all["all"]))
-        figure, config = processing.create_interval_bar_chart(
-            df_all, start_date, end_date, interval
+        return charts.cached(
+            "interval-bar",
+            build_interval_bar_data,
+            data_all,
+            start_date,
+            end_date,
+            session=session,
         )
-        return figure, config
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="faktura", function_name="interval_bar_figure"),
+        Output("interval-bar-chart", "figure"),
+        Output("interval-bar-chart", "config"),
+        Input("interval-bar-data", "data"),
+        Input("interval-dropdown", "value"),
+    )
@@ -1,23 +1,24 @@
 import plotly.express as px
 import pandas as pd
 
+from common import data, metrics
 
+
+@metrics.timed("aggregate")
 def filter_and_aggregate_by_interval_stacked(df, start_date, end_date, interval):
     """
-    Filtert das komplette Dataset nach Datum und aggregiert die 'Erfasste Menge'
+    Filtert den Tageswürfel nach Datum und aggregiert die 'Erfasste Menge'
     je nach gewähltem Intervall (z. B. täglich, wöchentlich oder monatlich) und
-    gruppiert zusätzlich nach Projekt (Kurztext).
+    gruppiert zusätzlich nach Projekt (Kurztext). Wochen- und Monatswerte werden
+    aus den Tagessummen aufgerollt.
     """
-    df["ProTime-Datum"] = pd.to_datetime(df["ProTime-Datum"], unit="ms")
-    df_filtered = df[
-        (df["ProTime-Datum"] >= pd.to_datetime(start_date))
-        & (df["ProTime-Datum"] <= pd.to_datetime(end_date))
-    ]
+    df_filtered = data.slice_by_date(df, start_date, end_date)
     if interval is None or interval not in ("D", "W", "ME"):
         interval = "D"
     df_agg = (
         df_filtered.groupby(
-            [pd.Grouper(key="ProTime-Datum", freq=interval), "Kurztext"]
+            [pd.Grouper(key="ProTime-Datum", freq=interval), "Kurztext"],
+            observed=True,
         )["Erfasste Menge"]
         .sum()
         .reset_index()
@@ -25,9 +26,10 @@ def filter_and_aggregate_by_interval_stacked(df, start_date, end_date, interval)
     return df_agg
 
 
-def create_interval_bar_chart(df_all, start_date, end_date, interval):
+@metrics.timed("figure")
+def create_interval_bar_chart(df_daily, start_date, end_date, interval):
     df_agg = filter_and_aggregate_by_interval_stacked(
-        df_all, start_date, end_date, interval
+        df_daily, start_date, end_date, interval
     )
 
     fig = px.bar(
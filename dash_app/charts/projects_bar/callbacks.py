@@ -1,9 +1,13 @@
-from io import StringIO
-
 from dash import Output, Input, State
-from common import data, charts
-from charts.projects_bar import processing
-import pandas as pd
+from common import charts, store
+
+
+def build_project_bar(key, start_date, end_date):
+    from charts.projects_bar import processing
+    from common import compute
+
+    df_grouped = compute.project_totals(key, start_date, end_date, faktura=True)
+    return processing.create_project_bar_chart(df_grouped)
 
 
 def register_callbacks(app):
@@ -14,13 +18,18 @@ def register_callbacks(app):
         Input("data-all", "data"),
         State("date-picker-range", "start_date"),
         State("date-picker-range", "end_date"),
+        State("session-id", "data"),
     )
-    def update_project_bar(_, data_all, start_date, end_date):
-        if not data_all or not data_all["faktura"]:
+    def update_project_bar(_, data_all, start_date, end_date, session):
+        if not store.has_dataset(data_all):
             return charts.empty_figure(), {}
 
-        df = pd.read_json(StringIO(data_all["faktura"]))
-
-        df_grouped = data.filter_data_by_date(df, start_date, end_date)
-        figure, config = processing.create_project_bar_chart(df_grouped)
+        figure, config = charts.cached(
+            "faktura-projekt",
+            build_project_bar,
+            data_all,
+            start_date,
+            end_date,
+            session=session,
+        )
         return figure, config
@@ -1,9 +1,13 @@
 import plotly.express as px
 
+from common import metrics
 
+
+@metrics.timed("figure")
 def create_project_bar_chart(df_grouped):
-    # Stunden berechnen
-    df_grouped["hours"] = df_grouped["Erfasste Menge"] * 8
+    # Stunden berechnen (df_grouped ist ein geteiltes Zwischenergebnis, daher
+    # auf einer Kopie)
+    df_grouped = df_grouped.assign(hours=df_grouped["Erfasste Menge"] * 8)
 
     # Bar-Chart, custom_data enthält jetzt die hours-Spalte
     bar_fig = px.bar(
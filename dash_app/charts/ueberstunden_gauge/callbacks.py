@@ -1,10 +1,14 @@
-from io import StringIO
-
 from dash import Output, Input, State
 
-from charts.ueberstunden_gauge import processing
-from common import data, charts
-import pandas as pd
+from common import charts, store
+
+
+def build_verhaeltnis_chart(key, start_date, end_date):
+    from charts.ueberstunden_gauge import processing
+
+    return processing.create_verhaeltnis_chart(
+        store.get_dataset(key)["daily"], start_date, end_date
+    )
 
 
 def register_callbacks(app):
@@ -15,13 +19,18 @@ def register_callbacks(app):
         Input("data-all", "data"),
         State("date-picker-range", "start_date"),
         State("date-picker-range", "end_date"),
+        State("session-id", "data"),
     )
-    def update_gauge_chart(_, data_all, start_date, end_date):
-        if not data_all or not data_all["all"]:
+    def update_gauge_chart(_, data_all, start_date, end_date, session):
+        if not store.has_dataset(data_all):
             return charts.empty_figure(), {}
 
-        df_all = pd.read_json(StringIO(data_all["all"]))
-        figure, config = processing.create_verhaeltnis_chart(
-            df_all, start_date, end_date
+        figure, config = charts.cached(
+            "ueberstunden",
+            build_verhaeltnis_chart,
+            data_all,
+            start_date,
+            end_date,
+            session=session,
         )
         return figure, config
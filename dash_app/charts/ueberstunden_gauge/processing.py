@@ -1,8 +1,7 @@
 import plotly.graph_objects as go
 import pandas as pd
-import holidays
 
-from common import data
+from common import data, metrics, workdays
 
 
 def calculate_expected_hours(start, end):
@@ -11,47 +10,25 @@ def calculate_expected_hours(start, end):
     unter Berücksichtigung von Wochenenden, Feiertagen (NRW) und
     speziellen Halbtagen (24.12. und 31.03. -> 4 Stunden statt 8).
     """
-    # Alle Tage im Zeitraum generieren
-    all_days = pd.date_range(start, end, freq="D")
-
-    # Feiertage in NRW bestimmen
-    years = list(range(start.year, end.year + 1))
-    nrw_holidays = holidays.Germany(prov="NW", years=years)
-    holiday_dates = set(nrw_holidays.keys())
-
-    total_hours = 0
-    for day in all_days:
-        day_date = day.date()
-        # Nur Wochentage, die keine Feiertage sind
-        if day.weekday() < 5 and day_date not in holiday_dates:
-            # Prüfe auf spezielle Halbtage: 24.12. oder 31.03.
-            if (day_date.month == 12 and day_date.day == 24) or (
-                day_date.month == 3 and day_date.day == 31
-            ):
-                total_hours += 4
-            else:
-                total_hours += 8
-    return total_hours
-
-
-def create_verhaeltnis_chart(df_all, start_date, end_date):
+    calendar = workdays.build_calendar(start, end)
+    return int(calendar["soll_hours"].sum())
+
+
+def calculate_hours_balance(df_daily, start_date, end_date):
     """
-    Erstellt ein Indicator-Chart, das die Über-/Unterstunden anzeigt.
+    Liefert (geleistete Stunden, Sollstunden) von start_date bis zum letzten
+    Buchungstag (höchstens end_date).
 
     - Die tatsächlich geleisteten Stunden werden als Summe der Spalte "Erfasste Menge" berechnet.
     - Als Sollstunden gelten 8 Stunden pro Tag im angegebenen Zeitraum.
-    - Es werden nur Zeilen berücksichtigt, bei denen "Auftrag/Projekt/Kst." einen Wert hat.
+    - Grundlage ist der Tageswürfel, der nur Buchungen mit "Auftrag/Projekt/Kst." enthält.
     """
-    # Filtere das DataFrame (nur Zeilen mit Projektdaten)
-    df_all["ProTime-Datum"] = pd.to_datetime(df_all["ProTime-Datum"], unit="ms")
-    df_filtered_projects = data.get_all_projects(df_all)
-
     # Konvertiere die Datumsangaben in datetime (angenommen, "ProTime-Datum" ist bereits datetime)
     start = pd.to_datetime(start_date)
     end = pd.to_datetime(end_date)
 
     # Bestimme das maximale Buchungsdatum in den Daten
-    max_buchungsdatum = df_filtered_projects["ProTime-Datum"].max()
+    max_buchungsdatum = df_daily["ProTime-Datum"].max()
 
     # Falls das Enddatum über das letzte Buchungsdatum hinausgeht, nehmen wir max_buchungsdatum
     effective_end = (
@@ -60,15 +37,24 @@ def create_verhaeltnis_chart(df_all, start_date, end_date):
 
 
     # Filtere das DataFrame nach Datum
-    df_filtered = df_filtered_projects[
-        (df_filtered_projects["ProTime-Datum"] >= start)
-        & (df_filtered_projects["ProTime-Datum"] <= effective_end)
-    ]
+    df_filtered = data.slice_by_date(df_daily, start, effective_end)
 
     # Summe der tatsächlich geleisteten Stunden
     actual_hours = df_filtered["Erfasste Menge"].sum()
 
     expected_hours = calculate_expected_hours(start, effective_end)
+    return float(actual_hours), expected_hours
+
+
+@metrics.timed("figure")
+def create_verhaeltnis_chart(df_daily, start_date, end_date):
+    """
+    Erstellt ein Indicator-Chart, das die Über-/Unterstunden anzeigt
+    (siehe calculate_hours_balance).
+    """
+    actual_hours, expected_hours = calculate_hours_balance(
+        df_daily, start_date, end_date
+    )
 
     # Differenz (positive Zahl: Überstunden, negative Zahl: Unterstunden)
     diff_hours = actual_hours - expected_hours
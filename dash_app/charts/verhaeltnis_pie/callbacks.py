@@ -1,10 +1,14 @@
-from io import StringIO
-
 from dash import Output, Input, State
 
-from charts.verhaeltnis_pie import processing
-from common import data, charts
-import pandas as pd
+from common import charts, store
+
+
+def build_verhaeltnis_pie(key, start_date, end_date):
+    from charts.verhaeltnis_pie import processing
+    from common import compute
+
+    df_grouped = compute.project_totals(key, start_date, end_date)
+    return processing.create_verhaeltnis_pie_chart(df_grouped)
 
 
 def register_callbacks(app):
@@ -15,13 +19,18 @@ def register_callbacks(app):
         Input("data-all", "data"),
         State("date-picker-range", "start_date"),
         State("date-picker-range", "end_date"),
+        State("session-id", "data"),
     )
-    def update_verhaeltnis_pie(_, data_all, start_date, end_date):
-        if not data_all or not data_all["all"]:
+    def update_verhaeltnis_pie(_, data_all, start_date, end_date, session):
+        if not store.has_dataset(data_all):
             return charts.empty_figure(), {}
 
-        df = pd.read_json(StringIO(data_all["all"]))
-
-        df_grouped = data.filter_data_by_date(df, start_date, end_date)
-        figure, config = processing.create_verhaeltnis_pie_chart(df_grouped)
+        figure, config = charts.cached(
+            "verhaeltnis-pie",
+            build_verhaeltnis_pie,
+            data_all,
+            start_date,
+            end_date,
+            session=session,
+        )
         return figure, config
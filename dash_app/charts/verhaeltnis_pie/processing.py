@@ -1,9 +1,12 @@
 import plotly.express as px
 
+from common import metrics
 
+
+@metrics.timed("figure")
 def create_verhaeltnis_pie_chart(df_grouped):
-    # 1) Stunden-Spalte hinzufügen
-    df_grouped["hours"] = df_grouped["Erfasste Menge"] * 8
+    # 1) Stunden-Spalte hinzufügen (auf einer Kopie, df_grouped wird geteilt)
+    df_grouped = df_grouped.assign(hours=df_grouped["Erfasste Menge"] * 8)
 
     # 2) Pie-Chart mit custom_data für hours
     pie_fig = px.pie(
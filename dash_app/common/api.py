@@ -0,0 +1,110 @@
+import datetime
+import hashlib
+import math
+
+import flask
+
+from common import charts, config, fiscal, store
+
+
+def _etag(*parts):
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _date_param(name, default):
+    import pandas as pd  # erst bei Bedarf, siehe common/startup.py
+
+    value = flask.request.args.get(name)
+    if value is None:
+        return default.isoformat()
+    try:
+        timestamp = pd.to_datetime(value)
+    except (ValueError, TypeError):
+        timestamp = None
+    # Leere Werte ("", "NaT") ergeben NaT statt eines Fehlers
+    if timestamp is None or pd.isna(timestamp):
+        flask.abort(400, f"Ungültiges Datum für {name}: {value}")
+    return timestamp.date().isoformat()
+
+
+def kpi_payload(dataset, start_date, end_date, faktura_target):
+    """
+    Kennzahlen (siehe kpis.summary) und Tageswerte des Burndowns als dict.
+    """
+    from common import kpis  # läuft im Prozess-Pool, nicht beim Start
+
+    df_burndown = kpis.burndown_series(dataset, start_date, end_date, faktura_target)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        **kpis.summary(dataset, start_date, end_date, faktura_target),
+        "burndown": {
+            "date": df_burndown["date"].dt.strftime("%Y-%m-%d").tolist(),
+            "actual_cum_pt": df_burndown["actual_cum_pt"].tolist(),
+            "ideal_pt": df_burndown["ideal_pt"].tolist(),
+        },
+    }
+
+
+def build_kpi_payload(key, start_date, end_date, faktura_target, _today):
+    return kpi_payload(store.get_dataset(key), start_date, end_date, faktura_target)
+
+
+def init_app(app):
+    """
+    Registriert GET /api/kpis?key=<Dataset-Schlüssel>&start=&end=&target=:
+    die Zahlen hinter Faktura Total, Ø PT/Stunden, Über-/Unterstunden und dem
+    Burndown als JSON. Ohne start/end gilt das aktuelle Geschäftsjahr, ohne
+    target die Zielvereinbarung aus der config.json.
+
+    Der ETag ergibt sich aus Dataset-Schlüssel und Parametern; pollende
+    Clients bekommen mit If-None-Match ein 304 ohne jede Berechnung.
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix
+
+    @server.route(prefix + "api/kpis")
+    def api_kpis():
+        key = flask.request.args.get("key", "")
+        fiscal_start, fiscal_end = fiscal.get_fiscal_year_range()
+        start_date = _date_param("start", fiscal_start)
+        end_date = _date_param("end", fiscal_end)
+        if start_date > end_date:
+            flask.abort(400, "start liegt nach end")
+        try:
+            faktura_target = float(
+                flask.request.args.get("target", config.get("faktura_target", 160))
+            )
+        except ValueError:
+            faktura_target = math.nan
+        if not math.isfinite(faktura_target):
+            flask.abort(400, "Ungültige Zielvereinbarung")
+
+        # Ohne Faktura-Buchung im Zeitraum wird ab heute gerechnet, daher
+        # gehört das Datum mit zum ETag
+        etag = _etag(
+            store.FORMAT_VERSION,
+            key,
+            start_date,
+            end_date,
+            faktura_target,
+            datetime.date.today().isoformat(),
+        )
+        if flask.request.if_none_match.contains(etag):
+            response = flask.Response(status=304)
+        else:
+            if not store.has_dataset(key):
+                flask.abort(404, "Unbekanntes Dataset")
+            payload = charts.cached_json(
+                "api-kpis",
+                build_kpi_payload,
+                key,
+                start_date,
+                end_date,
+                faktura_target,
+                datetime.date.today().isoformat(),
+            )
+            response = flask.Response(payload, mimetype="application/json")
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
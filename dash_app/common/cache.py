@@ -0,0 +1,69 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def frame_size(value):
+    """
+    Speicherbedarf eines DataFrames oder eines dicts aus DataFrames in Bytes.
+    """
+    if isinstance(value, dict):
+        return sum(frame_size(v) for v in value.values())
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Threadsicherer LRU-Cache, der nach der Gesamtgröße seiner Einträge begrenzt
+    ist. Beim Überschreiten von `max_bytes` werden die am längsten nicht mehr
+    benutzten Einträge verworfen; ein einzelner Eintrag größer als `max_bytes`
+    wird gar nicht erst aufgenommen.
+    """
+
+    def __init__(self, max_bytes, sizeof=frame_size):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.currsize = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.currsize -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.currsize += size
+            while self.currsize > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.currsize -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.currsize = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -1,7 +1,20 @@
-import plotly.graph_objects as go
+import base64
+import json
+import os
+
+from common import metrics, offload
+from common.cache import LRUCache
+
+# Obergrenze für die serialisierten Figures, die jeder Prozess vorhält
+MEMORY_BYTES = int(os.environ.get("FAKTURA_FIGURE_MEMORY_MB", "32")) * 1024 * 1024
+
+# Serialisierte Callback-Ergebnisse je (Dataset-Schlüssel, Chart, Parameter)
+_figures = LRUCache(MEMORY_BYTES)
 
 
 def empty_figure():
+    import plotly.graph_objects as go
+
     return go.Figure(
         layout={
             "xaxis": {"visible": False},
@@ -17,3 +30,136 @@ def empty_figure():
             ],
         }
     )
+
+
+def _plain(value):
+    import numpy as np
+
+    if isinstance(value, dict):
+        if "bdata" in value and "dtype" in value:
+            array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+            if "shape" in value:
+                array = array.reshape([int(n) for n in str(value["shape"]).split(",")])
+            return array.tolist()
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "M":
+            return np.datetime_as_string(value).tolist()
+        return value.tolist()
+    return value
+
+
+@metrics.timed("serialize")
+def plain_figure(fig):
+    """
+    Liefert die Figure als dict aus einfachen Listen. Plotly kodiert Zahlen-Arrays
+    base64 ({"bdata": ..., "dtype": ...}), die clientseitigen Callbacks in
+    assets/interval.js arbeiten aber direkt auf den Werten.
+    """
+    return _plain(fig.to_dict())
+
+
+def interval_chart_data(figures, config, **values):
+    """
+    Inhalt eines dcc.Store, aus dem ein clientseitiger Callback die Figures für
+    das gewählte Intervall ableitet: die Tages-Figures, deren Config und
+    zusätzliche Kennzahlen.
+    """
+    return {
+        "figures": [plain_figure(fig) for fig in figures],
+        "config": config,
+        **values,
+    }
+
+
+def empty_interval_chart_data(count=1):
+    """
+    Store-Inhalt, solange noch keine Daten geladen sind (siehe empty_figure).
+    """
+    return {
+        "figures": [plain_figure(empty_figure()) for _ in range(count)],
+        "config": {},
+        "empty": True,
+    }
+
+
+def _serialize(build, key, *params):
+    from plotly.io.json import to_json_plotly
+
+    result = build(key, *params)
+    with metrics.phase("serialize"):
+        return to_json_plotly(result)
+
+
+def cached(chart_id, build, key, *params, session=None):
+    """
+    Liefert das Ergebnis von build(key, *params) (Figures, Configs oder
+    Store-Inhalte) aus dem Figure-Cache. Schlüssel ist der Dataset-Schlüssel,
+    die Chart-ID und die Ansichtsparameter (Zeitraum, Intervall,
+    Zielvereinbarung); bei einem Treffer entfallen Pandas-Auswertung und
+    Plotly-Validierung, das Ergebnis wird nur aus dem gespeicherten JSON gelesen.
+
+    Bei einem Fehlgriff rechnet der Prozess-Pool (siehe offload.run); build
+    muss daher eine Funktion auf Modulebene sein, die sich das Dataset über
+    `key` selbst holt. Die Auswertung (processing, compute) importiert build
+    erst beim Aufruf, damit der Start der Worker sie nicht mitbezahlt. Mit
+    `session` verwirft ein neuerer Request derselben Sitzung die laufende
+    Berechnung.
+    """
+    payload = cached_json(chart_id, build, key, *params, session=session)
+    with metrics.phase("deserialize"):
+        return json.loads(payload)
+
+
+def cached_json(chart_id, build, key, *params, session=None):
+    """
+    Wie cached, liefert aber das gespeicherte JSON selbst (str), z. B. für
+    Antworten, die direkt als JSON verschickt werden.
+    """
+    cache_key = (key, chart_id) + params
+    payload = _figures.get(cache_key)
+    if payload is None:
+        with metrics.phase("pool"):
+            payload = offload.run(
+                session, chart_id, _serialize, build, key, *params
+            )
+        _figures.put(cache_key, payload)
+    return payload
+
+
+def cache_stats():
+    """
+    Treffer, Fehlgriffe, Anzahl und Größe (Bytes) der gecachten Figures.
+    """
+    return {
+        "hits": _figures.hits,
+        "misses": _figures.misses,
+        "entries": len(_figures),
+        "bytes": _figures.currsize,
+    }
+
+
+metrics.Gauge(
+    "faktura_figure_cache_hits_total",
+    "Treffer im Figure-Cache.",
+    lambda: cache_stats()["hits"],
+    kind="counter",
+)
+metrics.Gauge(
+    "faktura_figure_cache_misses_total",
+    "Fehlgriffe im Figure-Cache (Berechnung im Prozess-Pool).",
+    lambda: cache_stats()["misses"],
+    kind="counter",
+)
+metrics.Gauge(
+    "faktura_figure_cache_entries",
+    "Anzahl der Figures im Figure-Cache.",
+    lambda: cache_stats()["entries"],
+)
+metrics.Gauge(
+    "faktura_figure_cache_bytes",
+    "Größe der Figures im Figure-Cache in Bytes.",
+    lambda: cache_stats()["bytes"],
+)
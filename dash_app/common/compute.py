@@ -0,0 +1,146 @@
+import functools
+import os
+import threading
+
+import diskcache
+
+from common import data, store, workdays
+from common.cache import LRUCache
+
+# Obergrenze für die Zwischenergebnisse, die jeder Prozess vorhält
+MEMORY_BYTES = int(os.environ.get("FAKTURA_COMPUTE_MEMORY_MB", "64")) * 1024 * 1024
+# Obergrenze für die Zwischenergebnisse, die sich alle Prozesse auf der Platte teilen
+DISK_BYTES = int(os.environ.get("FAKTURA_COMPUTE_DISK_MB", "256")) * 1024 * 1024
+# Längste Wartezeit (Sekunden) auf einen anderen Prozess, der denselben Knoten
+# berechnet; danach rechnet der wartende selbst
+LOCK_EXPIRE = 60
+
+# Zwischenergebnisse je (Knoten, Dataset-Schlüssel, Parameter): im Speicher des
+# Prozesses und, da die Callbacks einer Aktualisierung auf verschiedene Worker
+# und Pool-Prozesse verteilt werden, für alle Prozesse im CACHE_DIR
+_results = LRUCache(MEMORY_BYTES)
+_shared = diskcache.Cache(
+    os.path.join(store.CACHE_DIR, "results"), size_limit=DISK_BYTES
+)
+_locks = {}
+_locks_lock = threading.Lock()
+_MISSING = object()
+
+
+def _lock_for(cache_key):
+    with _locks_lock:
+        return _locks.setdefault(cache_key, threading.Lock())
+
+
+def shared(func):
+    """
+    Macht aus einer Funktion einen Knoten des Rechengraphen: Das Ergebnis wird je
+    Argumentkombination (erstes Argument ist immer der Dataset-Schlüssel) einmal
+    berechnet und allen Callbacks zur Verfügung gestellt, auch denen in anderen
+    Workern und Pool-Prozessen. Fragen mehrere Callbacks gleichzeitig denselben
+    Knoten an, rechnet nur einer, die übrigen warten auf sein Ergebnis.
+    Ergebnisse werden geteilt und dürfen daher nicht verändert werden.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache_key = (
+            store.FORMAT_VERSION,
+            func.__qualname__,
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        result = _results.get(cache_key, _MISSING)
+        if result is not _MISSING:
+            return result
+
+        with _lock_for(cache_key):
+            result = _results.get(cache_key, _MISSING)
+            if result is _MISSING:
+                result = _shared_result(cache_key, func, args, kwargs)
+                _results.put(cache_key, result)
+        with _locks_lock:
+            _locks.pop(cache_key, None)
+        return result
+
+    return wrapper
+
+
+def _shared_result(cache_key, func, args, kwargs):
+    # Gleiches Muster wie in shared, nur über Prozessgrenzen: Der erste rechnet,
+    # die übrigen warten auf die Sperre und lesen dann sein Ergebnis
+    result = _shared.get(cache_key, _MISSING)
+    if result is not _MISSING:
+        return result
+    with diskcache.Lock(_shared, ("lock",) + cache_key, expire=LOCK_EXPIRE):
+        result = _shared.get(cache_key, _MISSING)
+        if result is _MISSING:
+            result = func(*args, **kwargs)
+            _shared.set(cache_key, result)
+    return result
+
+
+def clear():
+    """
+    Verwirft alle Zwischenergebnisse, im Prozess und auf der Platte (z. B. für
+    Messungen ohne Cache, siehe benchmarks/run.py).
+    """
+    _results.clear()
+    _shared.clear()
+
+
+def _dataset(key):
+    dataset = store.get_dataset(key)
+    if dataset is None:
+        raise LookupError(f"Unbekanntes Dataset: {key}")
+    return dataset
+
+
+@shared
+def project_totals(key, start_date, end_date, faktura=False):
+    """
+    PT je Projekt und Kurztext im Zeitraum (siehe data.filter_data_by_date).
+    """
+    return data.filter_data_by_date(
+        _dataset(key)["daily"], start_date, end_date, faktura=faktura
+    )
+
+
+@shared
+def calendar(key, start_date, end_date):
+    """
+    Tagesarten und verfügbare Arbeitstage im Zeitraum (siehe workdays.build_calendar).
+    """
+    df_absences = data.slice_by_date(_dataset(key)["absences"], start_date, end_date)
+    return workdays.build_calendar(start_date, end_date, df_absences)
+
+
+@shared
+def available_days(key, start_date, end_date):
+    """
+    Anzahl verfügbarer Arbeitstage im Zeitraum (siehe data.get_available_days).
+    """
+    return int(calendar(key, start_date, end_date)["available"].sum())
+
+
+def remaining_available_days(key, start_date, end_date):
+    """
+    Anzahl verfügbarer Arbeitstage vom letzten Faktura-Buchungstag bis end_date
+    (siehe data.remaining_available_days). Gibt es im Zeitraum keine
+    Faktura-Buchung, wird ab heute gerechnet; das Ergebnis wird daher nicht
+    selbst gemerkt, nur der Kalender darunter.
+    """
+    return data.remaining_available_days(
+        _dataset(key), start_date, end_date, functools.partial(available_days, key)
+    )
+
+
+@shared
+def fiscal_year_available_days(key, any_date):
+    """
+    Anzahl verfügbarer Arbeitstage im Geschäftsjahr, das `any_date` enthält
+    (siehe data.fiscal_year_available_days).
+    """
+    return data.fiscal_year_available_days(
+        _dataset(key), any_date, functools.partial(available_days, key)
+    )
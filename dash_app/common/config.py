@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+
+# Konfigurationsdatei im Installationsordner (relativ zu dash_app)
+CONFIG_PATH = "../config.json"
+
+
+def _read(path):
+    with open(path, "r") as file:
+        config = json.load(file)
+    return config if isinstance(config, dict) else {}
+
+
+def load(path=CONFIG_PATH):
+    """
+    Liest die config.json. Fehlt die Datei oder ist sie ungültig, gelten die
+    Standardwerte der jeweiligen Aufrufer.
+    """
+    try:
+        return _read(path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+_loaded_mtime = _mtime(CONFIG_PATH)
+_config = load()
+_lock = threading.Lock()
+
+
+def _reload_if_changed():
+    """
+    Liest die config.json neu, sobald sich ihre Änderungszeit ändert, damit
+    z. B. eine neue Zielvereinbarung ohne Neustart der Worker greift. Eine
+    gerade halb geschriebene (ungültige) Datei wird übergangen, bis sie wieder
+    gelesen werden kann; bis dahin gilt der bisherige Stand.
+    """
+    global _config, _loaded_mtime
+    mtime = _mtime(CONFIG_PATH)
+    if mtime == _loaded_mtime:
+        return
+    with _lock:
+        if mtime == _loaded_mtime:
+            return
+        try:
+            _config = {} if mtime is None else _read(CONFIG_PATH)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        _loaded_mtime = mtime
+
+
+def get(name, default=None):
+    _reload_if_changed()
+    return _config.get(name, default)
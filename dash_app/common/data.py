@@ -1,17 +1,76 @@
+import numpy as np
 import pandas as pd
 import datetime
-import holidays
+import functools
 import re
 
+from common import fiscal, metrics, workdays
+
 _LEISTUNG_STUNDE_RX = re.compile(r"\bStunde\b", flags=re.I)
 _LEISTUNG_NON_FAKT_RX = re.compile(r"nicht\s*fakturierte\s*stunde", flags=re.I)
 
+# Dimensionen des Tageswürfels (siehe build_daily_cube)
+CUBE_KEYS = ["ProTime-Datum", "Auftrag/Projekt/Kst.", "Kurztext", "Klasse"]
+
+# Positionsbezeichnungen, die einen Abwesenheitstag markieren
+ABSENCES = ("Urlaub", "Krank")
+
+# Buchungsklassen der Spalte "Klasse" (siehe classify_bookings)
+FAKTURA = 1  # Stunde auf einem Faktura-Projekt (K…, X…)
+NON_FAKTURA = 2  # „Nichtfakturierte Stunde“ auf einem Faktura-Projekt
+ABWESENHEIT = 3  # Urlaub oder Krankheit (siehe ABSENCES)
+INTERN = 4  # alle übrigen Buchungen
+
+# Text-Spalten mit wenigen verschiedenen Werten, die als category abgelegt werden
+CATEGORY_COLUMNS = ["Auftrag/Projekt/Kst.", "Kurztext", "Leistung", "Positionsbezeichnung"]
+
+
+def _per_unique(series, func):
+    """
+    Wendet func auf die verschiedenen Werte von series an (NA ausgenommen) und
+    verteilt das bool-Ergebnis zurück auf die Zeilen; NA ergibt False.
+    """
+    codes, uniques = pd.factorize(series)
+    result = np.append(np.asarray(func(pd.Series(uniques, dtype=object)), dtype=bool), False)
+    return result[codes]
+
+
+def classify_bookings(df: pd.DataFrame) -> pd.Series:
+    """
+    Ordnet jeder Buchung genau eine Klasse zu (FAKTURA, NON_FAKTURA,
+    ABWESENHEIT, INTERN; bei mehreren Treffern gilt diese Reihenfolge).
+    Die regulären Ausdrücke laufen nur über die verschiedenen Werte von
+    "Leistung" und "Auftrag/Projekt/Kst.", nicht über alle Zeilen.
+    """
+    faktura_project = _per_unique(
+        df["Auftrag/Projekt/Kst."], lambda values: values.str.startswith(("K", "X"), na=False)
+    )
+    non_fakt = _per_unique(
+        df["Leistung"], lambda values: values.str.contains(_LEISTUNG_NON_FAKT_RX, na=False)
+    )
+    stunde = _per_unique(
+        df["Leistung"], lambda values: values.str.contains(_LEISTUNG_STUNDE_RX, na=False)
+    )
+    if "Positionsbezeichnung" in df.columns:
+        absence = _per_unique(
+            df["Positionsbezeichnung"], lambda values: values.isin(ABSENCES)
+        )
+    else:
+        absence = np.zeros(len(df), dtype=bool)
+
+    klasse = np.select(
+        [faktura_project & stunde & ~non_fakt, faktura_project & non_fakt, absence],
+        [FAKTURA, NON_FAKTURA, ABWESENHEIT],
+        INTERN,
+    )
+    return pd.Series(klasse.astype("int8"), index=df.index, name="Klasse")
+
 
 def preprocess_leistung(df: pd.DataFrame) -> pd.DataFrame:
     """
     * verschiebt „Nichtfakturierte Stunde“-Buchungen, die aber auf ein
-      Faktura-Projekt (K…, X…) gehen, in ein eigenes Projekt
-      (Suffix „ - non Faktura“).
+      Faktura-Projekt (K…, X…) gehen (Spalte "Klasse" ist NON_FAKTURA, siehe
+      classify_bookings), in ein eigenes Projekt (Suffix „ - non Faktura“).
     * liefert eine Kopie des DataFrames zurück, verändert also nichts in-place.
     """
     df = df.copy()
@@ -19,11 +78,7 @@ def preprocess_leistung(df: pd.DataFrame) -> pd.DataFrame:
     # ----------------------------------------------------------
     #  1) Non-Faktura-Stunden auf Faktura-Projekten umetikettieren
     # ----------------------------------------------------------
-    mask_non_fakt_on_fakt_proj = (
-            df["Auftrag/Projekt/Kst."].notna()
-            & df["Auftrag/Projekt/Kst."].str.startswith(("K", "X"))
-            & df["Leistung"].str.contains(_LEISTUNG_NON_FAKT_RX, na=False)
-    )
+    mask_non_fakt_on_fakt_proj = df["Klasse"] == NON_FAKTURA
     df.loc[mask_non_fakt_on_fakt_proj, "Auftrag/Projekt/Kst."] = (
             df.loc[mask_non_fakt_on_fakt_proj, "Auftrag/Projekt/Kst."] + " - non Faktura"
     )
@@ -39,128 +94,232 @@ def split_allgemein(df):
     """
     Sucht in der Spalte 'Kurztext' nach dem Wert "Stunden - CONET Solutions GmbH".
     Für diese Zeilen wird der 'Kurztext' durch den Inhalt der Spalte
-    'Positionsbezeichnung' ersetzt. Falls mehrere Projekte (z. B. kommasepariert)
-    vorhanden sind, wird in mehrere Zeilen aufgeteilt.
+    'Positionsbezeichnung' ersetzt. Falls mehrere Projekte (kommasepariert)
+    vorhanden sind, wird in mehrere Zeilen aufgeteilt und die 'Erfasste Menge'
+    zu gleichen Teilen auf die Projekte verteilt. Wird einmal beim Import
+    aufgerufen (siehe import_data).
     """
+    if "Positionsbezeichnung" not in df.columns:
+        return df
     mask = df["Kurztext"] == "Stunden - CONET Solutions GmbH"
-    if "Positionsbezeichnung" in df.columns:
-        df.loc[mask, "Kurztext"] = df.loc[mask, "Positionsbezeichnung"].apply(
-            lambda x: (
-                [proj.strip() for proj in x.split(",")] if isinstance(x, str) else x
-            )
-        )
-        df = df.explode("Kurztext")
-    return df
+    if not mask.any():
+        return df
 
+    general = df[mask]
+    projects = general["Positionsbezeichnung"].str.split(",")
+    general = general.assign(
+        **{
+            "Kurztext": projects,
+            "Erfasste Menge": general["Erfasste Menge"]
+            / projects.str.len().fillna(1),
+        }
+    ).explode("Kurztext")
+    general["Kurztext"] = general["Kurztext"].str.strip()
+
+    # Aufgeteilte Zeilen bleiben an der Position der ursprünglichen Buchung
+    return (
+        pd.concat([df[~mask], general])
+        .sort_index(kind="stable")
+        .reset_index(drop=True)
+    )
 
-def get_faktura_projects(df):
+
+def is_faktura(df):
     """
-    Filtert das DataFrame auf Faktura-Projekte:
-    Nur Zeilen, in denen "Auftrag/Projekt/Kst." nicht NA ist und mit "K" oder "X" beginnt.
-    Zudem wird bei "Stunden - CONET Solutions GmbH" der Kurztext anhand der Spalte
-    'Positionsbezeichnung' aufgeteilt.
+    Maske der Faktura-Buchungen bzw. -Zeilen des Tageswürfels (Klasse
+    FAKTURA): "Auftrag/Projekt/Kst." beginnt mit "K" oder "X", die Leistung
+    ist eine Stunde, aber keine „Nichtfakturierte Stunde“.
     """
-    mask_code = df["Auftrag/Projekt/Kst."].notna() & df["Auftrag/Projekt/Kst."].str.startswith(("K", "X"))
+    return df["Klasse"] == FAKTURA
 
-    mask_stunde = (
-            df["Leistung"].str.contains(_LEISTUNG_STUNDE_RX, na=False)
-            & ~df["Leistung"].str.contains(_LEISTUNG_NON_FAKT_RX, na=False)
-    )
 
-    df_faktura = df[mask_code & mask_stunde].copy()
-    df_faktura = split_allgemein(df_faktura)
-    return df_faktura[
-        ["ProTime-Datum", "Erfasste Menge", "Auftrag/Projekt/Kst.", "Kurztext"]
-    ]
+def get_all_projects(df):
+    """
+    Filtert das DataFrame auf alle Projekte (nur Zeilen, in denen "Auftrag/Projekt/Kst." nicht NA ist).
+    """
+    return df[df["Auftrag/Projekt/Kst."].notna()]
 
 
-def get_all_projects(df):
+@metrics.timed("filter")
+def slice_by_date(df, start_date, end_date):
     """
-    Filtert das DataFrame auf alle Projekte (nur Zeilen, in denen "Auftrag/Projekt/Kst." nicht NA ist)
-    und wendet ebenfalls die Aufteilung für "Stunden - CONET Solutions GmbH" an.
+    Liefert alle Zeilen mit start_date <= 'ProTime-Datum' <= end_date.
+    Setzt voraus, dass df nach 'ProTime-Datum' sortiert ist (siehe import_data),
+    und sucht die Grenzen per Binärsuche statt über eine Maske über alle Zeilen.
     """
-    df_all = df[df["Auftrag/Projekt/Kst."].notna()]
-    df_all = split_allgemein(df_all)
-    return df_all
+    dates = df["ProTime-Datum"].to_numpy()
+    lower = dates.searchsorted(pd.Timestamp(start_date).to_datetime64(), side="left")
+    upper = dates.searchsorted(pd.Timestamp(end_date).to_datetime64(), side="right")
+    return df.iloc[lower:upper]
 
 
-def get_fiscal_year_range():
+def slice_cube(df_daily, start_date, end_date, faktura=False):
     """
-    Bestimmt den aktuellen Geschäftsjahresbereich (1. April bis 31. März).
+    Schneidet den Tageswürfel (siehe build_daily_cube) auf einen Datumsbereich,
+    mit faktura=True zusätzlich nur auf die Faktura-Stunden.
     """
-    today = datetime.date.today()
-    current_year = today.year
-    if today.month < 4:
-        fiscal_start = datetime.date(current_year - 1, 4, 1)
-        fiscal_end = datetime.date(current_year, 3, 31)
-    else:
-        fiscal_start = datetime.date(current_year, 4, 1)
-        fiscal_end = datetime.date(current_year + 1, 3, 31)
-    return fiscal_start, fiscal_end
+    df_daily = slice_by_date(df_daily, start_date, end_date)
+    if faktura:
+        df_daily = df_daily[is_faktura(df_daily)]
+    return df_daily
 
 
-def filter_data_by_date(df, start_date, end_date):
+def compact(df):
+    """
+    Speichersparende Typen für ein aufbereitetes DataFrame: Text-Spalten aus
+    CATEGORY_COLUMNS als category und 'ProTime-Datum' als datetime64. Liefert
+    eine Kopie. 'Erfasste Menge' bleibt float64: Aufgeteilte Allgemein-Stunden
+    (z. B. 7.5 / 3) sind in float32 nicht exakt und ließen die Summen sonst in
+    der vierten Nachkommastelle driften.
     """
-    Filtert das DataFrame nach Datum (basierend auf 'ProTime-Datum') und gruppiert
+    columns = {
+        column: df[column].astype("category")
+        for column in CATEGORY_COLUMNS
+        if column in df.columns
+    }
+    if "Erfasste Menge" in df.columns:
+        columns["Erfasste Menge"] = df["Erfasste Menge"].astype("float64")
+    if "ProTime-Datum" in df.columns:
+        columns["ProTime-Datum"] = pd.to_datetime(df["ProTime-Datum"])
+    return df.assign(**columns)
+
+
+def memory_report(dataset):
+    """
+    Zeilen und Speicherbedarf (Bytes, inkl. Strings) je DataFrame des Datasets.
+    """
+    return {
+        name: {
+            "rows": len(df),
+            "bytes": int(df.memory_usage(index=True, deep=True).sum()),
+        }
+        for name, df in dataset.items()
+    }
+
+
+@metrics.timed("aggregate")
+def filter_data_by_date(df, start_date, end_date, faktura=False):
+    """
+    Filtert den Tageswürfel nach Datum (basierend auf 'ProTime-Datum') und gruppiert
     nach ["Auftrag/Projekt/Kst.", "Kurztext"]. Dabei wird die 'Erfasste Menge'
-    in PT (8 Stunden = 1 PT) umgerechnet.
+    in PT (8 Stunden = 1 PT) umgerechnet. Mit faktura=True werden nur
+    Faktura-Stunden berücksichtigt.
     """
-    df["ProTime-Datum"] = pd.to_datetime(df["ProTime-Datum"], unit="ms")
-    df_filtered = df[
-        (df["ProTime-Datum"] >= pd.to_datetime(start_date))
-        & (df["ProTime-Datum"] <= pd.to_datetime(end_date))
-        ]
+    df_filtered = slice_cube(df, start_date, end_date, faktura=faktura)
     df_grouped = df_filtered.groupby(
-        ["Auftrag/Projekt/Kst.", "Kurztext"], as_index=False
+        ["Auftrag/Projekt/Kst.", "Kurztext"], as_index=False, observed=True
     )["Erfasste Menge"].sum()
     df_grouped["Erfasste Menge"] = df_grouped["Erfasste Menge"] / 8
     return df_grouped
 
 
-def get_available_days(df_all, start_date, end_date):
+def get_available_days(df_absences, start_date, end_date):
     """
     Gibt die Anzahl der verfügbaren Arbeitstage (Mo–Fr, ohne Feiertage, Urlaub und Krankheit)
     im angegebenen Zeitraum zurück.
     """
-    start_date = pd.to_datetime(start_date).normalize()
-    end_date = pd.to_datetime(end_date).normalize()
-    all_days = pd.date_range(start=start_date, end=end_date, freq="D")
-
-    absent_urlaub = set()
-    absent_krank = set()
-    if "Positionsbezeichnung" in df_all.columns:
-        vacation_rows = df_all.loc[
-            (df_all["Positionsbezeichnung"] == "Urlaub")
-            & (df_all["ProTime-Datum"] >= start_date)
-            & (df_all["ProTime-Datum"] <= end_date)
-            ]
-        absent_urlaub = set(vacation_rows["ProTime-Datum"].dt.normalize())
-        krank_rows = df_all.loc[
-            (df_all["Positionsbezeichnung"] == "Krank")
-            & (df_all["ProTime-Datum"] >= start_date)
-            & (df_all["ProTime-Datum"] <= end_date)
-            ]
-        absent_krank = set(krank_rows["ProTime-Datum"].dt.normalize())
-
-    years = range(start_date.year, end_date.year + 1)
-    nrw_holidays = holidays.Germany(prov="NW", years=years)
-    holiday_dates = set(nrw_holidays.keys())
-
-    available_count = 0
-    for day in all_days:
-        if (
-                (day.weekday() < 5)
-                and (day not in holiday_dates)
-                and (day not in absent_urlaub)
-                and (day not in absent_krank)
-        ):
-            available_count += 1
-    return available_count
+    calendar = workdays.build_calendar(
+        start_date, end_date, slice_by_date(df_absences, start_date, end_date)
+    )
+    return int(calendar["available"].sum())
+
+
+def get_remaining_range(df_daily, start_date, end_date):
+    """
+    Zeitraum (von, bis) vom letzten Faktura-Buchungstag bis end_date, für den
+    die noch verfügbaren Arbeitstage gezählt werden. Gibt es im Zeitraum keine
+    Faktura-Buchung, wird ab heute gerechnet. None, wenn end_date davor liegt.
+    """
+    # Ermittle den letzten gebuchten Arbeitstag anhand der Spalte "ProTime-Datum"
+    if not slice_cube(df_daily, start_date, end_date, faktura=True).empty:
+        letzter_buchungstag = (
+            df_daily.loc[is_faktura(df_daily), "ProTime-Datum"].max().date()
+        )
+    else:
+        letzter_buchungstag = datetime.date.today()
+
+    end_date_date = pd.to_datetime(end_date).date()
+    if end_date_date < letzter_buchungstag:
+        return None
+    return letzter_buchungstag, end_date_date
+
+
+def remaining_available_days(dataset, start_date, end_date, count_days=None):
+    """
+    Anzahl verfügbarer Arbeitstage vom letzten Faktura-Buchungstag bis end_date
+    (siehe get_remaining_range), 0 wenn end_date davor liegt. count_days(von,
+    bis) zählt die Tage; ohne wird get_available_days auf den Abwesenheiten des
+    Datasets aufgerufen (compute übergibt seine gemerkte Variante).
+    """
+    if count_days is None:
+        count_days = functools.partial(get_available_days, dataset["absences"])
+    remaining = get_remaining_range(dataset["daily"], start_date, end_date)
+    if remaining is None:
+        return 0
+    return count_days(*remaining)
+
+
+def fiscal_year_available_days(dataset, any_date, count_days=None):
+    """
+    Anzahl verfügbarer Arbeitstage im Geschäftsjahr, das `any_date` enthält
+    (count_days wie bei remaining_available_days).
+    """
+    if count_days is None:
+        count_days = functools.partial(get_available_days, dataset["absences"])
+    return count_days(*fiscal.get_fiscal_year_range_for(any_date))
+
+
+def build_daily_cube(df_all):
+    """
+    Verdichtet alle Buchungen zu einem Tageswürfel: Summe der 'Erfasste Menge'
+    je Tag, Projekt, Kurztext und Buchungsklasse (Spalte "Klasse", siehe
+    classify_bookings).
+    Die Spalten heißen wie im Export, sodass Auswertungen auf Buchungen
+    unverändert auf dem Würfel laufen. Sortiert nach 'ProTime-Datum'.
+    Projekt und Kurztext bleiben category, die Klasse int8 (siehe compact).
+    """
+    df_cube = df_all[CUBE_KEYS + ["Erfasste Menge"]].copy()
+    df_cube["ProTime-Datum"] = df_cube["ProTime-Datum"].dt.normalize()
+    return df_cube.groupby(CUBE_KEYS, as_index=False, dropna=False, observed=True)[
+        "Erfasste Menge"
+    ].sum()
+
+
+def get_absences(df_all):
+    """
+    Liefert die Abwesenheitsbuchungen (Urlaub, Krankheit) mit 'ProTime-Datum'
+    und 'Positionsbezeichnung', wie sie workdays.build_calendar erwartet.
+    """
+    columns = ["ProTime-Datum", "Positionsbezeichnung"]
+    if "Positionsbezeichnung" not in df_all.columns:
+        return pd.DataFrame(
+            {
+                "ProTime-Datum": pd.Series(dtype="datetime64[ns]"),
+                "Positionsbezeichnung": pd.Series(dtype=object),
+            }
+        )
+    df_absences = df_all.loc[df_all["Klasse"] == ABWESENHEIT, columns]
+    return df_absences.drop_duplicates(ignore_index=True)
 
 
 def import_data(df):
+    """
+    Bereitet einen eingelesenen Export auf und liefert das Dataset:
+      - "daily": Tageswürfel über alle Buchungen auf Projekte (siehe
+        build_daily_cube), aus dem alle Charts und Kennzahlen rechnen
+      - "absences": Urlaubs- und Krankheitstage (siehe get_absences)
+    Alle DataFrames sind nach 'ProTime-Datum' sortiert, damit Datumsbereiche
+    per slice_by_date geschnitten werden können, und kompakt typisiert (siehe
+    compact).
+    """
+    df = df.sort_values("ProTime-Datum", kind="stable", ignore_index=True)
+    df["Klasse"] = classify_bookings(df)
     df = preprocess_leistung(df)
-    df_faktura = get_faktura_projects(df)
-    df_all = get_all_projects(df)
+    df = split_allgemein(df)
+    df_projects = compact(get_all_projects(df))
+    df_absences = get_absences(df_projects)
 
-    return df_all, df_faktura
+    return {
+        "daily": build_daily_cube(df_projects),
+        "absences": df_absences,
+    }
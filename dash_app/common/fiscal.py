@@ -0,0 +1,33 @@
+import datetime
+
+# Ohne pandas, damit das Layout beim Start des Workers ohne die schweren
+# Abhängigkeiten auskommt (siehe common/startup.py)
+
+
+def get_fiscal_year_range():
+    """
+    Bestimmt den aktuellen Geschäftsjahresbereich (1. April bis 31. März).
+    """
+    today = datetime.date.today()
+    current_year = today.year
+    if today.month < 4:
+        fiscal_start = datetime.date(current_year - 1, 4, 1)
+        fiscal_end = datetime.date(current_year, 3, 31)
+    else:
+        fiscal_start = datetime.date(current_year, 4, 1)
+        fiscal_end = datetime.date(current_year + 1, 3, 31)
+    return fiscal_start, fiscal_end
+
+
+def get_fiscal_year_range_for(any_date):
+    """
+    Liefert das Geschäftsjahr (01.04.–31.03.), das `any_date`
+    enthält. Akzeptiert str, Timestamp oder date.
+    """
+    import pandas as pd
+
+    d = pd.to_datetime(any_date).date()
+    if d.month < 4:
+        return (datetime.date(d.year - 1, 4, 1), datetime.date(d.year, 3, 31))
+    else:
+        return (datetime.date(d.year, 4, 1), datetime.date(d.year + 1, 3, 31))
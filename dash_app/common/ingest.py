@@ -0,0 +1,52 @@
+import importlib.util
+import io
+import os
+
+import pandas as pd
+
+# Spalten des ProTime-Exports, die in common/data.py tatsächlich verwendet werden.
+# "Positionsbezeichnung" ist optional, alle anderen Spalten werden nicht gelesen.
+COLUMNS = [
+    "ProTime-Datum",
+    "Erfasste Menge",
+    "Auftrag/Projekt/Kst.",
+    "Kurztext",
+    "Leistung",
+    "Positionsbezeichnung",
+]
+
+# Text-Spalten werden als str gelesen, damit z. B. rein numerische Kostenstellen
+# nicht als Zahl ankommen und die String-Operationen in data.py brechen.
+DTYPES = {
+    "Erfasste Menge": "float64",
+    "Auftrag/Projekt/Kst.": str,
+    "Kurztext": str,
+    "Leistung": str,
+    "Positionsbezeichnung": str,
+}
+
+
+def _default_engine():
+    if importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "openpyxl"
+
+
+# "calamine" (Rust, deutlich schneller) oder "openpyxl"
+ENGINE = os.environ.get("FAKTURA_EXCEL_ENGINE") or _default_engine()
+
+
+def read_export(raw, engine=None):
+    """
+    Liest einen ProTime-Export (Bytes einer .xlsx-Datei) ein. Es werden nur die
+    Spalten aus COLUMNS gelesen und nach DTYPES typisiert, "ProTime-Datum"
+    kommt immer als datetime64 zurück.
+    """
+    df = pd.read_excel(
+        io.BytesIO(raw),
+        engine=engine or ENGINE,
+        usecols=lambda column: column in COLUMNS,
+        dtype=DTYPES,
+    )
+    df["ProTime-Datum"] = pd.to_datetime(df["ProTime-Datum"], dayfirst=True)
+    return df
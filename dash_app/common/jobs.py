@@ -0,0 +1,15 @@
+import os
+
+import diskcache
+from dash import DiskcacheManager
+
+from common import store
+
+# Warteschlange der Hintergrund-Callbacks; liegt auf der Platte, damit jeder
+# Worker die Jobs der anderen sieht (kein externer Broker nötig)
+JOBS_DIR = os.environ.get("FAKTURA_JOBS_DIR", os.path.join(store.CACHE_DIR, "jobs"))
+
+# Ergebnisse abgeholter Jobs werden nach dieser Zeit (Sekunden) verworfen
+EXPIRE = 600
+
+manager = DiskcacheManager(diskcache.Cache(JOBS_DIR), expire=EXPIRE)
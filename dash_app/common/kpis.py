@@ -0,0 +1,96 @@
+import pandas as pd
+
+from charts.burndown_bar import processing as burndown
+from charts.faktura_gauge import processing as faktura_gauge
+from charts.ueberstunden_gauge import processing as ueberstunden
+from common import data, workdays
+
+
+def summary(dataset, start_date, end_date, faktura_target):
+    """
+    Die Kennzahlen hinter den Indikatoren des Dashboards als dict:
+      - Faktura Total (create_gauge_chart)
+      - Rest zur Zielvereinbarung und Ø PT pro Tag
+        (create_daily_average_indicators)
+      - Über-/Unterstunden (create_verhaeltnis_chart)
+      - Ziel-PT des Zeitraums für die Burndown-Ideallinie
+    """
+    df_grouped = data.filter_data_by_date(
+        dataset["daily"], start_date, end_date, faktura=True
+    )
+    faktura_pt = float(df_grouped["Erfasste Menge"].sum())
+    remaining_days = data.remaining_available_days(dataset, start_date, end_date)
+    actual_hours, expected_hours = ueberstunden.calculate_hours_balance(
+        dataset["daily"], start_date, end_date
+    )
+    calendar = workdays.build_calendar(
+        start_date,
+        end_date,
+        data.slice_by_date(dataset["absences"], start_date, end_date),
+    )
+
+    return {
+        "faktura_pt": faktura_pt,
+        "faktura_target_pt": faktura_target,
+        "remaining_pt": max(faktura_target - faktura_pt, 0),
+        "remaining_days": remaining_days,
+        "daily_needed_pt": faktura_gauge.get_daily_needed_pt(
+            df_grouped, remaining_days, faktura_target
+        ),
+        "actual_hours": actual_hours,
+        "expected_hours": expected_hours,
+        "overtime_hours": actual_hours - expected_hours,
+        "available_days": int(calendar["available"].sum()),
+        "burndown_target_pt": burndown.get_dynamic_target(
+            calendar,
+            data.fiscal_year_available_days(dataset, start_date),
+            faktura_target,
+        ),
+    }
+
+
+def projects(dataset, start_date, end_date):
+    """
+    PT je Projekt und Kurztext im Zeitraum, mit Faktura-Anteil.
+    """
+    df_all = data.filter_data_by_date(dataset["daily"], start_date, end_date)
+    df_faktura = data.filter_data_by_date(
+        dataset["daily"], start_date, end_date, faktura=True
+    )
+    keys = ["Auftrag/Projekt/Kst.", "Kurztext"]
+    df = df_all.merge(
+        df_faktura, on=keys, how="left", suffixes=("", " Faktura")
+    ).fillna({"Erfasste Menge Faktura": 0.0})
+    return pd.DataFrame(
+        {
+            "project": df["Auftrag/Projekt/Kst."].astype(str),
+            "kurztext": df["Kurztext"].astype(str),
+            "pt": df["Erfasste Menge"].astype(float),
+            "faktura_pt": df["Erfasste Menge Faktura"].astype(float),
+        }
+    )
+
+
+def burndown_series(dataset, start_date, end_date, faktura_target):
+    """
+    Tageswerte des Burndowns: kumulierte Faktura und Ideallinie in PT.
+    """
+    calendar = workdays.build_calendar(
+        start_date,
+        end_date,
+        data.slice_by_date(dataset["absences"], start_date, end_date),
+    )
+    target = burndown.get_dynamic_target(
+        calendar, data.fiscal_year_available_days(dataset, start_date), faktura_target
+    )
+    all_days, actual_cum, ideal_values, df_bar = burndown.get_burndown_data(
+        dataset["daily"], calendar, start_date, end_date, target=target
+    )
+    return pd.DataFrame(
+        {
+            "date": all_days,
+            "actual_cum_pt": actual_cum.to_numpy(dtype=float),
+            "ideal_pt": ideal_values,
+            "day_type": df_bar["day_type"].to_numpy(),
+        }
+    )
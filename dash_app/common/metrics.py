@@ -0,0 +1,447 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+import flask
+from dash import dcc
+
+# Grenzen der Latenz-Histogramme in Sekunden
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_DISPATCH = "_dash-update-component"
+
+# Messung des aktuellen Callback-Requests (siehe init_app); außerhalb eines
+# Requests (z. B. in den Benchmarks) wird nichts gemessen
+_current = contextvars.ContextVar("faktura_metrics_request", default=None)
+
+_registry = []
+
+# Jeder gunicorn-Worker zählt im eigenen Speicher; damit /metrics die Werte
+# aller Worker des Pods liefert, legt jeder sie als <PID>.json hier ab
+# (Standard: <FAKTURA_CACHE_DIR>/metrics, siehe _directory)
+METRICS_DIR = os.environ.get("FAKTURA_METRICS_DIR")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """
+    Prometheus-Counter mit Labels. Gezählt wird je Prozess, ausgegeben die
+    Summe über alle Worker (siehe render).
+    """
+
+    # Auch beendete Worker zählen mit (siehe _collect)
+    live_only = False
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                [list(labelvalues), value]
+                for labelvalues, value in self._values.items()
+            ]
+
+    @staticmethod
+    def merge(values, labelvalues, value):
+        values[labelvalues] = values.get(labelvalues, 0) + value
+
+    def render(self, values):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labelvalues, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Prometheus-Histogramm mit Labels und festen Bucket-Grenzen (siehe Counter).
+    """
+
+    live_only = False
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                [list(labelvalues), [list(counts), total, count]]
+                for labelvalues, (counts, total, count) in self._values.items()
+            ]
+
+    @staticmethod
+    def merge(values, labelvalues, value):
+        counts, total, count = value
+        entry = values.get(labelvalues)
+        if entry is None:
+            values[labelvalues] = [list(counts), total, count]
+            return
+        entry[0] = [a + b for a, b in zip(entry[0], counts)]
+        entry[1] += total
+        entry[2] += count
+
+    def render(self, values):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labelvalues, (counts, total, count) in sorted(values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _labels(self.labelnames, labelvalues, [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _labels(self.labelnames, labelvalues, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """
+    Wert ohne Labels, den read() erst beim Schreiben des Stands liefert (z. B.
+    Kennzahlen eines Caches). Als "gauge" summiert über die laufenden Worker,
+    mit kind="counter" wie ein Counter über alle Worker.
+    """
+
+    def __init__(self, name, documentation, read, kind="gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.live_only = kind == "gauge"
+        self._read = read
+        _registry.append(self)
+
+    def snapshot(self):
+        return [[[], self._read()]]
+
+    merge = staticmethod(Counter.merge)
+
+    def render(self, values):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for value in values.values():
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+callback_seconds = Histogram(
+    "faktura_callback_duration_seconds",
+    "Dauer eines Callback-Requests inklusive Deserialisierung und Serialisierung.",
+    ["callback"],
+)
+phase_seconds = Histogram(
+    "faktura_callback_phase_duration_seconds",
+    "Dauer der Phasen eines Callback-Requests (ohne enthaltene Phasen).",
+    ["callback", "phase"],
+)
+request_bytes = Counter(
+    "faktura_callback_request_bytes_total",
+    "Größe der Callback-Requests in Bytes.",
+    ["callback"],
+)
+response_bytes = Counter(
+    "faktura_callback_response_bytes_total",
+    "Größe der Callback-Antworten in Bytes.",
+    ["callback"],
+)
+store_bytes = Counter(
+    "faktura_store_payload_bytes_total",
+    "In einen dcc.Store geschriebene Bytes.",
+    ["store"],
+)
+store_writes = Counter(
+    "faktura_store_payloads_total",
+    "Anzahl der Antworten, die einen dcc.Store beschreiben.",
+    ["store"],
+)
+
+
+class _Request:
+    __slots__ = ("callback", "start", "stack", "phases")
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.start = time.perf_counter()
+        self.stack = []
+        self.phases = {}
+
+
+@contextlib.contextmanager
+def phase(name):
+    """
+    Misst die Zeit des umschlossenen Blocks als Phase `name` des laufenden
+    Callback-Requests. Verschachtelte Phasen werden der äußeren abgezogen, die
+    Phasen eines Requests summieren sich also höchstens zur Gesamtdauer.
+    """
+    request = _current.get()
+    if request is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    request.stack.append(0.0)
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = request.stack.pop()
+        if request.stack:
+            request.stack[-1] += elapsed
+        request.phases[name] = request.phases.get(name, 0.0) + elapsed - nested
+
+
+def collect(func, *args):
+    """
+    Führt func(*args) mit eigener Messung aus und liefert (Ergebnis, Phasen).
+    Für Arbeit in einem anderen Prozess (siehe offload.run), dessen Metriken
+    nie abgefragt werden; die Phasen übernimmt add_phases im Worker.
+    """
+    request = _Request(None)
+    token = _current.set(request)
+    try:
+        result = func(*args)
+    finally:
+        _current.reset(token)
+    return result, request.phases
+
+
+def add_phases(phases):
+    """
+    Rechnet anderswo gemessene Phasen (siehe collect) dem laufenden
+    Callback-Request zu. Wie verschachtelte Phasen werden sie der umgebenden
+    Phase abgezogen.
+    """
+    request = _current.get()
+    if request is None:
+        return
+    for name, seconds in phases.items():
+        request.phases[name] = request.phases.get(name, 0.0) + seconds
+    if request.stack:
+        request.stack[-1] += sum(phases.values())
+
+
+def timed(name):
+    """
+    Decorator: misst jeden Aufruf der Funktion als Phase `name` (siehe phase).
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _callback_name(output):
+    # "..a.figure...a.config.." bzw. "a.figure" -> "a"
+    return output.strip(".").split("...")[0].rsplit(".", 1)[0]
+
+
+def _store_ids(component):
+    if isinstance(component, dcc.Store):
+        yield component.id
+    children = getattr(component, "children", None)
+    if not isinstance(children, (list, tuple)):
+        children = [children]
+    for child in children:
+        if child is not None and hasattr(child, "to_plotly_json"):
+            yield from _store_ids(child)
+
+
+def init_app(app):
+    """
+    Misst alle Callback-Requests der Dash-App: Gesamtdauer, Phasen, Größe von
+    Request und Antwort sowie die Bytes, die in dcc.Store-Komponenten landen.
+    Die Zeit, die keiner Phase zugeordnet ist (vor allem das Serialisieren
+    der Antwort durch Dash), wird als Phase "serialize" erfasst.
+    """
+    server = app.server
+    dispatch_path = app.config.routes_pathname_prefix + _DISPATCH
+    # app.layout kann auch eine Funktion sein (siehe layout.serve_layout)
+    layout = app.layout() if callable(app.layout) else app.layout
+    stores = set(_store_ids(layout))
+
+    @server.before_request
+    def _start():
+        if flask.request.path != dispatch_path:
+            return
+        start = time.perf_counter()
+        body = flask.request.get_json(silent=True) or {}
+        request = _Request(_callback_name(body.get("output", "")))
+        request.start = start
+        request.phases["deserialize"] = time.perf_counter() - start
+        flask.g.faktura_metrics = _current.set(request)
+
+    @server.after_request
+    def _finish(response):
+        request = _current.get()
+        if request is None or flask.request.path != dispatch_path:
+            return response
+        total = time.perf_counter() - request.start
+        request.phases["serialize"] = (
+            request.phases.get("serialize", 0.0) + total - sum(request.phases.values())
+        )
+
+        callback = request.callback
+        callback_seconds.observe(total, callback)
+        for name, seconds in request.phases.items():
+            phase_seconds.observe(max(seconds, 0.0), callback, name)
+        request_bytes.inc(flask.request.content_length or 0, callback)
+        if not response.is_streamed:
+            size = response.calculate_content_length() or 0
+            response_bytes.inc(size, callback)
+            if callback in stores:
+                store_bytes.inc(size, callback)
+                store_writes.inc(1, callback)
+        return response
+
+    @server.teardown_request
+    def _reset(_exc):
+        token = flask.g.pop("faktura_metrics", None)
+        if token is not None:
+            _current.reset(token)
+            # Fehlt das Verzeichnis kurzzeitig, fehlt nur dieser Stand in /metrics
+            with contextlib.suppress(OSError):
+                flush()
+
+
+def _directory():
+    from common import store  # store importiert metrics
+
+    return METRICS_DIR or os.path.join(store.CACHE_DIR, "metrics")
+
+
+def _parent():
+    """
+    Kennung des Elternprozesses (bei gunicorn der Master): PID und, wo /proc
+    es hergibt, seine Startzeit, da z. B. im Container jeder Master PID 1 hat.
+    """
+    ppid = os.getppid()
+    try:
+        with open(f"/proc/{ppid}/stat") as file:
+            started = file.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        started = None
+    return [ppid, started]
+
+
+def flush():
+    """
+    Schreibt die Werte dieses Prozesses nach <METRICS_DIR>/<PID>.json, damit
+    render in jedem Worker die Summe über alle Worker ausgeben kann.
+    """
+    directory = _directory()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    payload = {
+        "parent": _parent(),
+        "metrics": {metric.name: metric.snapshot() for metric in _registry},
+    }
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(payload, file)
+    os.replace(f"{path}.tmp", path)
+
+
+def _alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name != "posix":
+        return False  # os.kill würde den Prozess unter Windows beenden
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _collect():
+    """
+    Summiert die Werte aller Prozesse mit demselben Elternprozess. Dateien
+    beendeter Worker zählen weiter mit, damit die Counter nicht zurückspringen
+    (Gauges nur von laufenden Workern); Dateien eines früheren Starts werden
+    entfernt.
+    """
+    values = {metric.name: {} for metric in _registry}
+    parent = _parent()
+    for entry in os.scandir(_directory()):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path) as file:
+                payload = json.load(file)
+        except (OSError, ValueError):
+            continue
+        if payload.get("parent") != parent:
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
+            continue
+        alive = _alive(int(entry.name[: -len(".json")]))
+        for metric in _registry:
+            if metric.live_only and not alive:
+                continue
+            for labelvalues, value in payload["metrics"].get(metric.name, []):
+                metric.merge(values[metric.name], tuple(labelvalues), value)
+    return values
+
+
+def render():
+    """
+    Alle Metriken im Prometheus-Textformat, summiert über alle Worker.
+    """
+    flush()
+    values = _collect()
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render(values[metric.name]))
+    return "\n".join(lines) + "\n"
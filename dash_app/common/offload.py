@@ -0,0 +1,87 @@
+import concurrent.futures
+import os
+import threading
+
+import diskcache
+from dash.exceptions import PreventUpdate
+
+from common import metrics, profiling, store
+
+# Prozesse je Worker für die Chart-Berechnungen; 0 rechnet direkt im Worker
+POOL_WORKERS = int(os.environ.get("FAKTURA_POOL_WORKERS", "2"))
+
+# Wie oft (Sekunden) ein wartender Request prüft, ob er überholt wurde
+POLL_INTERVAL = 0.1
+# Generationszähler werden nach dieser Zeit (Sekunden) ohne neuen Request
+# verworfen; so lange läuft keine Berechnung
+GENERATION_EXPIRE = 3600
+
+# Generationszähler je (Sitzung, Chart); auf der Platte, da die Requests
+# einer Sitzung in verschiedenen Workern landen können
+_generations = diskcache.Cache(os.path.join(store.CACHE_DIR, "generations"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # Erst beim ersten Aufruf, also nach dem Fork der gunicorn-Worker
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ProcessPoolExecutor(max_workers=POOL_WORKERS)
+        return _pool
+
+
+def next_generation(session, chart_id):
+    """
+    Zählt die Generation von (session, chart_id) hoch und liefert sie. Jeder
+    neue Request für denselben Chart derselben Sitzung überholt damit alle
+    vorherigen. Jede Tab-Kennung legt eigene Zähler an, daher laufen sie nach
+    GENERATION_EXPIRE ab.
+    """
+    key = (session, chart_id)
+    with _generations.transact():
+        generation = _generations.get(key, 0) + 1
+        _generations.set(key, generation, expire=GENERATION_EXPIRE)
+    return generation
+
+
+def is_current(session, chart_id, generation):
+    return _generations.get((session, chart_id)) == generation
+
+
+def run(session, chart_id, func, *args):
+    """
+    Führt func(*args) im Prozess-Pool aus und liefert das Ergebnis. Ist
+    `session` gesetzt, gilt „latest wins“: Kommt während der Berechnung ein
+    neuerer Request für denselben Chart derselben Sitzung, wird die Berechnung
+    abgebrochen (falls sie noch wartet) bzw. ihr Ergebnis verworfen, und der
+    Callback liefert PreventUpdate.
+    func und args müssen sich pickeln lassen (Funktionen auf Modulebene).
+    Wird der Request profiliert (siehe profiling.py), rechnet func direkt im
+    Worker, damit die Auswertung im Profil auftaucht.
+    """
+    generation = next_generation(session, chart_id) if session else None
+
+    if POOL_WORKERS <= 0 or profiling.active():
+        result = func(*args)
+    else:
+        future = _get_pool().submit(metrics.collect, func, *args)
+        while True:
+            try:
+                result, phases = future.result(timeout=POLL_INTERVAL)
+                break
+            except concurrent.futures.TimeoutError:
+                if generation is not None and not is_current(
+                    session, chart_id, generation
+                ):
+                    future.cancel()
+                    raise PreventUpdate
+        # Phasen aus dem Pool (filter, aggregate, figure, serialize) zählen
+        # für den Callback, als wären sie hier gelaufen
+        metrics.add_phases(phases)
+
+    if generation is not None and not is_current(session, chart_id, generation):
+        raise PreventUpdate
+    return result
@@ -0,0 +1,167 @@
+import cProfile
+import datetime
+import io
+import os
+import pstats
+import re
+
+import flask
+
+from common import config, store
+
+# Verzeichnis für die Profile, die über /profiles abgerufen werden können
+PROFILE_DIR = os.environ.get(
+    "FAKTURA_PROFILE_DIR", os.path.join(store.CACHE_DIR, "profiles")
+)
+# Ältere Profile werden darüber hinaus gelöscht
+MAX_PROFILES = 200
+
+HEADER = "X-Faktura-Profile"
+PARAM = "profile"
+COOKIE = "faktura_profile"
+
+_DISPATCH = "_dash-update-component"
+_NAME_RX = re.compile(r"[0-9A-Za-z_.-]+")
+
+
+def enabled():
+    """
+    Profiling ist nur aktiv, wenn es in der config.json eingeschaltet ist
+    ("profiling": true).
+    """
+    return bool(config.get("profiling", False))
+
+
+def _accepts(value):
+    # Mit "profiling_token" in der config.json muss genau dieser Wert kommen
+    token = config.get("profiling_token")
+    if token:
+        return value == token
+    return value not in (None, "", "0")
+
+
+def _requested():
+    request = flask.request
+    return _accepts(
+        request.headers.get(HEADER)
+        or request.args.get(PARAM)
+        or request.cookies.get(COOKIE)
+    )
+
+
+def active():
+    """
+    Ob der laufende Request gerade profiliert wird (siehe init_app).
+    """
+    return flask.has_request_context() and "faktura_profile" in flask.g
+
+
+def _callback_name(output):
+    return output.strip(".").split("...")[0].rsplit(".", 1)[0]
+
+
+def _prune():
+    names = sorted(
+        entry.name for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".txt")
+    )
+    for name in names[:-MAX_PROFILES]:
+        for suffix in (".txt", ".prof"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name[: -len(".txt")] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def save(profiler, label):
+    """
+    Legt ein Profil ab: als .prof (pstats, z. B. für snakeviz) und als
+    Textbericht nach kumulierter Zeit. Liefert den Namen ohne Endung.
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = "{}-{}-{}".format(
+        datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f"),
+        re.sub(r"[^0-9A-Za-z_-]", "_", label) or "request",
+        os.getpid(),
+    )
+    profiler.dump_stats(os.path.join(PROFILE_DIR, name + ".prof"))
+
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(60)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(30)
+    with open(os.path.join(PROFILE_DIR, name + ".txt"), "w") as file:
+        file.write(report.getvalue())
+
+    _prune()
+    return name
+
+
+def init_app(app):
+    """
+    Opt-in-Profiling einzelner Callback-Requests mit cProfile. Ausgelöst über
+    den Header X-Faktura-Profile, den Query-Parameter ?profile=1 (setzt beim
+    Aufruf des Dashboards ein Cookie, sodass alle folgenden Callbacks der
+    Sitzung profiliert werden; ?profile=0 löscht es) oder das Cookie selbst.
+    Die Berichte liegen unter /profiles, ebenfalls nur mit Header, Parameter
+    oder Cookie (mit "profiling_token" also nur mit dem Token).
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix
+    dispatch_path = prefix + _DISPATCH
+
+    @server.before_request
+    def _start():
+        if not enabled() or flask.request.path != dispatch_path:
+            return
+        if not _requested():
+            return
+        body = flask.request.get_json(silent=True) or {}
+        flask.g.faktura_profile = (
+            cProfile.Profile(),
+            _callback_name(body.get("output", "")),
+        )
+        # Unter gevent landen auch andere Greenlets desselben Workers im Profil
+        flask.g.faktura_profile[0].enable()
+
+    @server.after_request
+    def _finish(response):
+        if not enabled():
+            return response
+        if flask.request.path == prefix and PARAM in flask.request.args:
+            value = flask.request.args[PARAM]
+            if _accepts(value):
+                response.set_cookie(COOKIE, value, httponly=True, samesite="Strict")
+            else:
+                response.delete_cookie(COOKIE)
+
+        profile = flask.g.pop("faktura_profile", None)
+        if profile is not None:
+            profiler, label = profile
+            profiler.disable()
+            response.headers[HEADER + "-Report"] = (
+                f"{prefix}profiles/{save(profiler, label)}.txt"
+            )
+        return response
+
+    @server.route(prefix + "profiles")
+    def list_profiles():
+        if not enabled() or not _requested():
+            flask.abort(404)
+        try:
+            names = sorted(
+                (entry.name for entry in os.scandir(PROFILE_DIR)),
+                reverse=True,
+            )
+        except FileNotFoundError:
+            names = []
+        return (
+            "\n".join(names) + "\n",
+            200,
+            {"Content-Type": "text/plain; charset=utf-8"},
+        )
+
+    @server.route(prefix + "profiles/<name>")
+    def get_profile(name):
+        if not enabled() or not _requested() or not _NAME_RX.fullmatch(name):
+            flask.abort(404)
+        return flask.send_from_directory(PROFILE_DIR, name)
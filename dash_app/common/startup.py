@@ -0,0 +1,110 @@
+import contextlib
+import datetime
+import importlib
+import os
+import sys
+import time
+
+# Pakete, die der Start eines Workers nicht laden sollte; taucht eines davon im
+# Bericht auf, hat ein Import auf Modulebene sie wieder in den Startpfad gezogen
+HEAVY_PACKAGES = (
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "plotly.express",
+    "holidays",
+    "openpyxl",
+)
+
+# Bericht beim Start auf stderr ausgeben (FAKTURA_STARTUP_REPORT=0 schaltet ihn ab)
+REPORT = os.environ.get("FAKTURA_STARTUP_REPORT", "1") != "0"
+
+# Module, die warm_up vorab lädt: alles, was die Callbacks erst beim ersten
+# Aufruf importieren
+WARM_MODULES = (
+    "common.data",
+    "common.compute",
+    "common.ingest",
+    "common.kpis",
+    "charts.burndown_bar.processing",
+    "charts.faktura_gauge.processing",
+    "charts.overview_bar.processing",
+    "charts.projects_bar.processing",
+    "charts.ueberstunden_gauge.processing",
+    "charts.verhaeltnis_pie.processing",
+    "plotly.io.json",
+)
+
+_steps = []
+_reported = 0
+
+
+@contextlib.contextmanager
+def step(name):
+    """
+    Misst einen Schritt des Starts (Import, Layout, Registrierung) und merkt
+    sich, welche schweren Pakete (HEAVY_PACKAGES) er neu geladen hat.
+    """
+    loaded = {package for package in HEAVY_PACKAGES if package in sys.modules}
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        heavy = [
+            package
+            for package in HEAVY_PACKAGES
+            if package in sys.modules and package not in loaded
+        ]
+        _steps.append((name, elapsed, heavy))
+
+
+def load(name):
+    """
+    Importiert das Modul `name` als eigenen Schritt (siehe step).
+    """
+    with step(name):
+        return importlib.import_module(name)
+
+
+def warm_up():
+    """
+    Erledigt vorab, was sonst jeder Worker beim ersten Callback selbst täte:
+    Auswertungen samt pandas und Plotly importieren, die Feiertage der Jahre um
+    heute berechnen und das Plotly-Template laden. Gedacht für gunicorn mit
+    preload_app (siehe gunicorn.conf.py): Im Master aufgerufen, teilen sich
+    alle Worker und ihre Prozess-Pools das Ergebnis per Copy-on-Write.
+    """
+    for name in WARM_MODULES:
+        load(name)
+    with step("Feiertage"):
+        from common import workdays
+
+        year = datetime.date.today().year
+        for any_year in range(year - 1, year + 2):
+            workdays.holidays_for_year(any_year)
+    with step("Plotly-Template"):
+        from common import charts
+
+        charts.empty_figure()
+
+
+def report(title):
+    """
+    Die seit dem letzten Bericht gemessenen Schritte als Text, teuerste zuerst.
+    """
+    global _reported
+    steps, _reported = _steps[_reported:], len(_steps)
+    total = sum(elapsed for _, elapsed, _ in steps)
+    lines = [f"{title} von Prozess {os.getpid()} in {total * 1000:.0f} ms:"]
+    for name, elapsed, heavy in sorted(steps, key=lambda entry: -entry[1]):
+        line = f"  {elapsed * 1000:7.1f} ms  {name}"
+        if heavy:
+            line += f"  (lädt {', '.join(heavy)})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def print_report(title="Start"):
+    if REPORT:
+        print(report(title), file=sys.stderr, flush=True)
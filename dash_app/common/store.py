@@ -0,0 +1,217 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from common import metrics
+from common.cache import LRUCache
+
+# pandas und pyarrow werden erst beim Lesen/Schreiben eines Datasets geladen;
+# Worker, die nur Schlüssel prüfen (has_dataset), brauchen sie nicht
+
+# Verzeichnis, über das sich alle Worker-Prozesse die geparsten Datasets teilen
+CACHE_DIR = os.environ.get(
+    "FAKTURA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "faktura-statistik")
+)
+# Obergrenze für die Datasets, die jeder Prozess zusätzlich im Speicher hält
+MEMORY_BYTES = int(os.environ.get("FAKTURA_CACHE_MEMORY_MB", "256")) * 1024 * 1024
+# Datasets, die so lange (Stunden) von keinem Worker benutzt wurden, werden
+# aus dem CACHE_DIR entfernt ...
+TTL_SECONDS = float(os.environ.get("FAKTURA_CACHE_TTL_HOURS", "168")) * 3600
+# ... ebenso die am längsten unbenutzten, solange alle zusammen mehr belegen
+DISK_BYTES = int(os.environ.get("FAKTURA_CACHE_DISK_MB", "2048")) * 1024 * 1024
+# Die Benutzung wird höchstens so oft (Sekunden) je Dataset und Prozess vermerkt
+TOUCH_INTERVAL = 60
+
+# Bei Änderungen an der Ausgabe von data.import_data erhöhen, damit Datasets
+# aus älteren Versionen im Cache-Verzeichnis nicht mehr verwendet werden
+FORMAT_VERSION = 7
+
+_KEY_RX = re.compile(r"[0-9a-f]{64}")
+_VERSION_RX = re.compile(r"v[0-9]+")
+
+# Ergebnis von data.import_data je Upload-Hash
+_memory = LRUCache(MEMORY_BYTES)
+# Zeitpunkt, zu dem dieser Prozess die Benutzung eines Datasets zuletzt vermerkt hat
+_touched = {}
+
+
+def dataset_key(raw):
+    """
+    Liefert den Schlüssel eines Uploads: SHA-256 über die dekodierten Bytes.
+    Identische Exporte landen damit immer unter demselben Schlüssel.
+    """
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _path(key=""):
+    return os.path.join(CACHE_DIR, f"v{FORMAT_VERSION}", key)
+
+
+def _to_table(df):
+    """
+    Wandelt ein DataFrame in eine Arrow-Tabelle um. Spalten, die Excel mit
+    gemischten Typen liefert (z. B. Zahlen und Text), werden als Text abgelegt.
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    df = df.reset_index(drop=True)
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for column in df.columns[df.dtypes == object]:
+            df[column] = df[column].map(lambda x: x if pd.isna(x) else str(x))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_frame(path, df):
+    """
+    Schreibt ein DataFrame als unkomprimierte Arrow-IPC-Datei (Feather v2).
+    Datums- und Zahlentypen bleiben erhalten, beim Lesen muss also nichts neu
+    interpretiert werden; ohne Kompression lässt sich die Datei direkt mappen
+    (siehe read_frame).
+    """
+    import pyarrow as pa
+
+    table = _to_table(df)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_frame(path):
+    """
+    Öffnet eine Arrow-IPC-Datei per Memory-Map. Zahlen- und Datumsspalten ohne
+    Lücken zeigen ohne Kopie in die Datei und sind daher schreibgeschützt; alle
+    Worker, die dasselbe Dataset lesen, teilen sich so eine Kopie im Page-Cache.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _touch(key):
+    """
+    Vermerkt die Benutzung des Datasets `key` an der Änderungszeit seines
+    Verzeichnisses, die evict für alle Worker auswertet.
+    """
+    now = time.time()
+    if now - _touched.get(key, 0) < TOUCH_INTERVAL:
+        return
+    _touched[key] = now
+    try:
+        os.utime(_path(key))
+    except FileNotFoundError:
+        pass
+
+
+def _disk_usage(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def evict(keep=None):
+    """
+    Räumt das CACHE_DIR auf: Verzeichnisse älterer FORMAT_VERSIONs, Datasets,
+    die länger als TTL_SECONDS nicht benutzt wurden, und danach die am
+    längsten unbenutzten, bis alle zusammen höchstens DISK_BYTES belegen.
+    `keep` (z. B. das gerade abgelegte Dataset) bleibt in jedem Fall.
+    Worker, die ein entferntes Dataset noch im Speicher haben, lesen weiter
+    aus ihren Mappings; das System gibt die Dateien erst danach frei.
+    """
+    try:
+        versions = [entry for entry in os.scandir(CACHE_DIR) if entry.is_dir()]
+    except FileNotFoundError:
+        return
+    for entry in versions:
+        if _VERSION_RX.fullmatch(entry.name) and entry.name != f"v{FORMAT_VERSION}":
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    datasets = []
+    for entry in os.scandir(_path()):
+        if entry.is_dir() and _KEY_RX.fullmatch(entry.name) and entry.name != keep:
+            try:
+                datasets.append(
+                    (entry.stat().st_mtime, _disk_usage(entry.path), entry.path)
+                )
+            except FileNotFoundError:
+                pass  # von einem anderen Prozess gerade entfernt
+
+    now = time.time()
+    total = sum(size for _, size, _ in datasets)
+    if keep is not None and os.path.isdir(_path(keep)):
+        total += _disk_usage(_path(keep))
+    for last_used, size, path in sorted(datasets):
+        if now - last_used > TTL_SECONDS or total > DISK_BYTES:
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+@metrics.timed("serialize")
+def put_dataset(key, dataset):
+    """
+    Legt ein Dataset (dict aus DataFrames, siehe data.import_data) unter `key` ab:
+    im Speicher des aktuellen Prozesses und als Arrow-Dateien im CACHE_DIR,
+    damit auch Callbacks, die in anderen Workern landen, darauf zugreifen können.
+    """
+    os.makedirs(_path(), exist_ok=True)
+    if not os.path.isdir(_path(key)):
+        tmp_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=_path())
+        for name, df in dataset.items():
+            write_frame(os.path.join(tmp_dir, f"{name}.arrow"), df)
+        try:
+            os.rename(tmp_dir, _path(key))
+        except OSError:
+            # Ein anderer Worker hat denselben Export gerade abgelegt
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        evict(keep=key)
+    _memory.put(key, dataset)
+    _touch(key)
+    return key
+
+
+def has_dataset(key):
+    """
+    Prüft, ob es das Dataset zu `key` gibt, ohne es zu laden.
+    """
+    if not isinstance(key, str) or not _KEY_RX.fullmatch(key):
+        return False
+    return key in _memory or os.path.isdir(_path(key))
+
+
+@metrics.timed("deserialize")
+def get_dataset(key):
+    """
+    Liefert das Dataset zu `key` oder None, falls der Schlüssel unbekannt ist
+    (z. B. nach einem Neustart mit geleertem Cache-Verzeichnis).
+    """
+    import pyarrow as pa
+
+    # Der Schlüssel kommt aus dem Browser und wird Teil eines Dateipfads
+    if not isinstance(key, str) or not _KEY_RX.fullmatch(key):
+        return None
+
+    dataset = _memory.get(key)
+    if dataset is not None:
+        _touch(key)
+        return dataset
+
+    try:
+        dataset = {
+            entry.name[: -len(".arrow")]: read_frame(entry.path)
+            for entry in os.scandir(_path(key))
+            if entry.name.endswith(".arrow")
+        }
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    if not dataset:
+        return None
+
+    _memory.put(key, dataset)
+    _touch(key)
+    return dataset
@@ -0,0 +1,103 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from common import metrics
+
+# Bundesland für die Feiertage
+REGION = "NW"
+
+# Halbe Arbeitstage (Monat, Tag): 24.12. und 31.03. zählen nur 4 Stunden
+HALF_DAYS = ((12, 24), (3, 31))
+
+
+def day_range(start_date, end_date):
+    """
+    Alle Kalendertage von start_date bis end_date (inklusive) als datetime64[D].
+    """
+    start = np.datetime64(pd.to_datetime(start_date).date(), "D")
+    end = np.datetime64(pd.to_datetime(end_date).date(), "D")
+    return np.arange(start, end + 1, dtype="datetime64[D]")
+
+
+@functools.lru_cache(maxsize=None)
+def holidays_for_year(year, region=REGION):
+    """
+    Feiertage eines Jahres im Bundesland `region`, sortiert als datetime64[D].
+    Die Feiertage sind statisch und werden pro Prozess nur einmal berechnet;
+    das zurückgegebene Array ist schreibgeschützt, da es geteilt wird.
+    """
+    import holidays  # erst bei Bedarf, der Import kostet spürbar Startzeit
+
+    regional_holidays = holidays.Germany(subdiv=region, years=year)
+    dates = np.array(sorted(regional_holidays.keys()), dtype="datetime64[D]")
+    dates.setflags(write=False)
+    return dates
+
+
+def holiday_days(start_date, end_date, region=REGION):
+    """
+    Feiertage in `region` (Standard: NRW) für alle Jahre zwischen start_date
+    und end_date, sortiert als datetime64[D].
+    """
+    start = pd.to_datetime(start_date)
+    end = pd.to_datetime(end_date)
+    return np.concatenate(
+        [holidays_for_year(year, region) for year in range(start.year, end.year + 1)]
+        or [np.array([], dtype="datetime64[D]")]
+    )
+
+
+def absence_days(df_all, positionsbezeichnung):
+    """
+    Alle Tage, an denen im Export eine Abwesenheit (z. B. "Urlaub" oder "Krank")
+    gebucht ist, sortiert als datetime64[D].
+    """
+    if df_all is None or "Positionsbezeichnung" not in df_all.columns:
+        return np.array([], dtype="datetime64[D]")
+    dates = df_all.loc[
+        df_all["Positionsbezeichnung"] == positionsbezeichnung, "ProTime-Datum"
+    ]
+    return np.unique(dates.to_numpy().astype("datetime64[D]"))
+
+
+@metrics.timed("aggregate")
+def build_calendar(start_date, end_date, df_all=None):
+    """
+    Klassifiziert jeden Tag zwischen start_date und end_date einmalig und
+    vektorisiert. Liefert ein DataFrame (Index: Tag) mit den Spalten
+      - weekend, holiday, urlaub, krank: Tagesart
+      - available: Arbeitstag (Mo–Fr, kein Feiertag, kein Urlaub, nicht krank)
+      - soll_hours: Sollstunden (8, an Halbtagen 4, sonst 0), unabhängig von
+        Urlaub und Krankheit
+    Ohne df_all gibt es keine Abwesenheiten.
+    """
+    days = day_range(start_date, end_date)
+
+    weekend = ~np.is_busday(days)
+    holiday = np.isin(days, holiday_days(start_date, end_date))
+    urlaub = np.isin(days, absence_days(df_all, "Urlaub"))
+    krank = np.isin(days, absence_days(df_all, "Krank"))
+
+    workday = ~weekend & ~holiday
+    available = workday & ~urlaub & ~krank
+
+    month = days.astype("datetime64[M]").astype(int) % 12 + 1
+    day_of_month = (days - days.astype("datetime64[M]")).astype(int) + 1
+    half_day = np.zeros(len(days), dtype=bool)
+    for half_month, half_dom in HALF_DAYS:
+        half_day |= (month == half_month) & (day_of_month == half_dom)
+    soll_hours = np.where(workday, np.where(half_day, 4, 8), 0)
+
+    return pd.DataFrame(
+        {
+            "weekend": weekend,
+            "holiday": holiday,
+            "urlaub": urlaub,
+            "krank": krank,
+            "available": available,
+            "soll_hours": soll_hours,
+        },
+        index=pd.DatetimeIndex(days.astype("datetime64[ns]")),
+    )
@@ -0,0 +1,34 @@
+# Konfiguration für gunicorn (Dockerfile: gunicorn app:server -c gunicorn.conf.py)
+import gc
+import os
+
+from gevent import monkey
+
+bind = "0.0.0.0:80"
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "gevent"
+timeout = 120
+accesslog = "-"
+errorlog = "-"
+
+# App, Layout und Auswertungen einmal im Master laden und vorberechnen; die
+# Worker erben sie beim Fork und teilen sie per Copy-on-Write, statt sie
+# einzeln aufzubauen (FAKTURA_PRELOAD=0 lädt wie bisher in jedem Worker)
+preload_app = os.environ.get("FAKTURA_PRELOAD", "1") != "0"
+
+if preload_app:
+    # Die App wird schon im Master importiert; Locks und Thread-Locals, die
+    # dabei entstehen, müssen bereits die von gevent sein
+    monkey.patch_all()
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from common import startup
+
+    startup.warm_up()
+    startup.print_report("Vorwärmen")
+    # Alles bis hierher aus der Garbage Collection nehmen, damit sie in den
+    # Workern die geteilten Seiten nicht anfasst und damit kopiert
+    gc.freeze()
@@ -1,30 +1,121 @@
 import base64
-import io
+import logging
 
-import pandas as pd
-from dash import Output, Input
+from dash import Output, Input, State, no_update
 
-from common import data
+from common import jobs, store
+
+logger = logging.getLogger(__name__)
+
+# Schritte des Uploads für die Fortschrittsanzeige
+UPLOAD_STEPS = (
+    "Datei wird dekodiert",
+    "Export wird gelesen",
+    "Daten werden aufbereitet",
+    "Dataset wird gespeichert",
+)
+
+# Abstand (ms), in dem der Browser nach dem Stand des Upload-Jobs fragt; jede
+# Abfrage schickt den Upload erneut mit (Dash-Standard: 1000)
+UPLOAD_POLL_INTERVAL = 250
+
+
+def _decode(contents):
+    content_type, content_string = contents.split(",")
+    return base64.b64decode(content_string)
 
 
 def register_callbacks(app):
+    # Jeder Browser-Tab erhält einmalig eine zufällige Kennung
+    app.clientside_callback(
+        """
+        function(_, sessionId) {
+            if (sessionId) {
+                return window.dash_clientside.no_update;
+            }
+            return window.crypto.randomUUID();
+        }
+        """,
+        Output("session-id", "data"),
+        Input("session-id", "modified_timestamp"),
+        State("session-id", "data"),
+    )
+
     @app.callback(
-        Output("data-all", "data"),
+        Output("data-all", "data", allow_duplicate=True),
+        Output("upload-pending", "data"),
         Input("upload-data", "contents"),
+        prevent_initial_call=True,
     )
-    def update_output(contents):
-
+    def check_upload(contents):
+        # Im Browser liegt nur der Schlüssel, die DataFrames bleiben geparst im
+        # serverseitigen Dataset-Cache. Ein erneut hochgeladener Export (z. B.
+        # nach einem Reload der Seite) wird direkt beantwortet, ohne Job.
         if contents is None:
+            return None, no_update
+        key = store.dataset_key(_decode(contents))
+        if store.has_dataset(key):
+            return key, no_update
+        return no_update, key
+
+    @app.callback(
+        Output("data-all", "data"),
+        Input("upload-pending", "data"),
+        State("upload-data", "contents"),
+        # Einlesen und Aufbereiten laufen in einem eigenen Prozess, damit der
+        # (gevent-)Worker währenddessen andere Requests bedienen kann
+        background=True,
+        manager=jobs.manager,
+        interval=UPLOAD_POLL_INTERVAL,
+        progress=[
+            Output("upload-progress", "value"),
+            Output("upload-progress", "max"),
+            Output("upload-status", "children"),
+        ],
+        running=[
+            (
+                Output("upload-running", "className"),
+                "flex items-center gap-2",
+                "hidden",
+            ),
+            (Output("upload-data", "disabled"), True, False),
+        ],
+        cancel=[Input("upload-cancel", "n_clicks")],
+        prevent_initial_call=True,
+    )
+    def update_output(set_progress, pending, contents):
+        from common import data, ingest
+
+        if pending is None or contents is None:
             return None
 
-        content_type, content_string = contents.split(",")
-        decoded = base64.b64decode(content_string)
+        def progress(step):
+            set_progress((str(step), str(len(UPLOAD_STEPS)), UPLOAD_STEPS[step]))
+
+        progress(0)
+        decoded = _decode(contents)
+        key = store.dataset_key(decoded)
+        # Ein anderer Tab kann denselben Export inzwischen abgelegt haben
+        if store.has_dataset(key):
+            return key
 
         try:
-            df = pd.read_excel(io.BytesIO(decoded))
-            df_all, df_faktura = data.import_data(df)
-            return {"all": df_all.to_json(), "faktura": df_faktura.to_json()}
+            progress(1)
+            df = ingest.read_export(decoded)
+            progress(2)
+            dataset = data.import_data(df)
+            report = data.memory_report(dataset)
+            logger.info(
+                "Dataset %s: %s",
+                key[:12],
+                ", ".join(
+                    f"{name} {entry['rows']} Zeilen / {entry['bytes'] / 1024:.0f} KiB"
+                    for name, entry in report.items()
+                ),
+            )
+            progress(3)
+            return store.put_dataset(key, dataset)
 
-        except Exception as e:
-            print(e)
+        except Exception:
+            logger.exception("Upload %s konnte nicht verarbeitet werden", key[:12])
             return None
@@ -1,28 +1,51 @@
-import json
-
 from dash import html, dcc
 from dash_iconify import DashIconify
-from common import data
+from common import config, fiscal
 
 
 def load_config():
-    try:
-        with open("../config.json", "r") as file:
-            config = json.load(file)
-            return config.get("faktura_target", 160)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return 160
+    return config.get("faktura_target", 160)
+
+
+# Zuletzt gebautes Layout und die Werte, aus denen es entstanden ist
+_served = (None, None)
 
 
-faktura_target = load_config()
+def serve_layout():
+    """
+    Layout für jeden Seitenaufruf (app.layout). Gebaut wird nur, wenn sich die
+    Zielvereinbarung in der config.json oder das Geschäftsjahr geändert hat;
+    sonst wird dasselbe Layout ausgeliefert (mit preload_app einmal im
+    Master gebaut und von allen Workern geteilt, siehe gunicorn.conf.py).
+    """
+    global _served
+    params = (load_config(), fiscal.get_fiscal_year_range())
+    served_params, layout = _served
+    if params != served_params:
+        layout = create_layout(params[0])
+        _served = (params, layout)
+    return layout
 
 
-def create_layout():
-    fiscal_start, fiscal_end = data.get_fiscal_year_range()
+def create_layout(faktura_target=None):
+    if faktura_target is None:
+        faktura_target = load_config()
+    fiscal_start, fiscal_end = fiscal.get_fiscal_year_range()
 
     return html.Div(
         [
             dcc.Store(id="data-all"),
+            # Schlüssel eines Uploads, der noch nicht im Dataset-Cache liegt
+            # und im Hintergrund eingelesen wird (siehe interactions/callbacks.py)
+            dcc.Store(id="upload-pending"),
+            # Kennung des Browser-Tabs: neuere Chart-Anfragen verwerfen ältere
+            # (siehe common/offload.py). Nur im Speicher, da der Browser den
+            # sessionStorage beim Duplizieren eines Tabs mitkopiert
+            dcc.Store(id="session-id", storage_type="memory"),
+            # Tageswerte der Charts mit Intervall-Auswahl (siehe assets/interval.js)
+            dcc.Store(id="interval-bar-data"),
+            dcc.Store(id="hours-burndown-data"),
+            dcc.Store(id="faktura-daily-avg-data"),
             # Datumsbereich
             html.Div(
                 [
@@ -47,6 +70,24 @@ def create_layout():
                                 ],
                                 className="flex items-center border border-dashed border-slate-300 hover:bg-slate-200 hover:border-blue-500 rounded-md",
                             ),
+                            # Fortschritt des Uploads (siehe interactions/callbacks.py)
+                            html.Div(
+                                [
+                                    html.Progress(
+                                        id="upload-progress", className="w-[120px]"
+                                    ),
+                                    html.Span(
+                                        id="upload-status", className="text-gray-700"
+                                    ),
+                                    html.Button(
+                                        "Abbrechen",
+                                        id="upload-cancel",
+                                        className="px-3 h-10 bg-white rounded-md shadow-md hover:bg-slate-200",
+                                    ),
+                                ],
+                                id="upload-running",
+                                className="hidden",
+                            ),
                             html.Div(
                                 [
                                     dcc.DatePickerRange(
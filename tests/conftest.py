@@ -0,0 +1,51 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASH_APP = os.path.join(ROOT, "dash_app")
+
+# Eigenes Cache-Verzeichnis, auch wenn FAKTURA_CACHE_DIR gesetzt ist (die
+# Tests legen z. B. Metrik-Dateien fremder Worker an), und Berechnung im
+# selben Prozess, damit die Tests nichts mit einem laufenden Server teilen
+CACHE_DIR = tempfile.mkdtemp(prefix="faktura-tests-")
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+os.environ["FAKTURA_CACHE_DIR"] = CACHE_DIR
+for _name in ("FAKTURA_JOBS_DIR", "FAKTURA_PROFILE_DIR", "FAKTURA_METRICS_DIR"):
+    os.environ.pop(_name, None)
+os.environ.setdefault("FAKTURA_POOL_WORKERS", "0")
+os.environ.setdefault("FAKTURA_STARTUP_REPORT", "0")
+sys.path.insert(0, DASH_APP)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.chdir(DASH_APP)  # config.py liest ../config.json
+
+
+@pytest.fixture(scope="session")
+def export():
+    """
+    Kleiner synthetischer Export inklusive aufgeteilter allgemeiner Stunden.
+    """
+    from generate import generate_export
+
+    return generate_export(rows=2_000, general_share=0.2, seed=1)
+
+
+@pytest.fixture(scope="session")
+def dataset_key(export):
+    """
+    Schlüssel des aufbereiteten Exports im Dataset-Store.
+    """
+    from common import data, store
+
+    return store.put_dataset(store.dataset_key(b"tests"), data.import_data(export))
+
+
+@pytest.fixture(scope="session")
+def client():
+    import app
+
+    return app.server.test_client()
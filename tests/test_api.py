@@ -0,0 +1,64 @@
+import pytest
+
+
+def _kpis(client, dataset_key, **params):
+    return client.get("/api/kpis", query_string={"key": dataset_key, **params})
+
+
+def test_kpis(client, dataset_key):
+    response = _kpis(client, dataset_key, start="2024-04-01", end="2025-03-31")
+    assert response.status_code == 200
+    assert response.json["start_date"] == "2024-04-01"
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"start": ""},
+        {"end": "NaT"},
+        {"start": "kein Datum"},
+        {"target": "nan"},
+        {"target": "inf"},
+        {"target": "-inf"},
+        {"target": "viel"},
+        {"start": "2025-03-31", "end": "2024-04-01"},
+    ],
+)
+def test_invalid_parameters_are_rejected(client, dataset_key, params):
+    assert _kpis(client, dataset_key, **params).status_code == 400
+
+
+def test_unknown_dataset(client):
+    assert _kpis(client, "0" * 64).status_code == 404
+
+
+def test_if_none_match_returns_304(client, dataset_key):
+    params = {"start": "2024-04-01", "end": "2025-03-31", "target": "160"}
+    first = _kpis(client, dataset_key, **params)
+    assert first.status_code == 200 and first.headers["ETag"]
+
+    second = client.get(
+        "/api/kpis",
+        query_string={"key": dataset_key, **params},
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.get_data() == b""
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [{"target": "150"}, {"start": "2024-05-01"}, {"end": "2025-02-28"}],
+)
+def test_etag_changes_with_parameters(client, dataset_key, changed):
+    params = {"start": "2024-04-01", "end": "2025-03-31", "target": "160"}
+    etag = _kpis(client, dataset_key, **params).headers["ETag"]
+
+    response = client.get(
+        "/api/kpis",
+        query_string={"key": dataset_key, **params, **changed},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
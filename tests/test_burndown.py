@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+START, END = "2024-12-16", "2025-01-17"
+
+
+@pytest.fixture
+def absences():
+    return pd.DataFrame(
+        {
+            "ProTime-Datum": pd.to_datetime(
+                ["2024-12-19", "2024-12-20", "2025-01-08", "2025-01-09"]
+            ),
+            "Positionsbezeichnung": ["Urlaub", "Urlaub", "Krank", "Krank"],
+        }
+    )
+
+
+@pytest.fixture
+def daily():
+    from common import data
+
+    dates = pd.to_datetime(
+        ["2024-12-16", "2024-12-17", "2024-12-17", "2025-01-02", "2025-01-10"]
+    )
+    return pd.DataFrame(
+        {
+            "ProTime-Datum": dates,
+            "Auftrag/Projekt/Kst.": ["K1", "K1", "I1", "X2", "K1"],
+            "Kurztext": ["A", "A", "Intern", "B", "A"],
+            "Klasse": np.array(
+                [data.FAKTURA, data.FAKTURA, data.INTERN, data.FAKTURA, data.FAKTURA],
+                dtype="int8",
+            ),
+            "Erfasste Menge": [8.0, 6.0, 2.0, 7.5 / 3, 4.0],
+        }
+    )
+
+
+def _reference(df_daily, calendar, start_date, end_date, target):
+    """
+    Die frühere Berechnung Tag für Tag (vor der Vektorisierung).
+    """
+    from common import data
+
+    all_days = pd.date_range(start_date, end_date, freq="D")
+    faktura = df_daily[data.is_faktura(df_daily)]
+    actual_cum, total = [], 0.0
+    for day in all_days:
+        total += (
+            faktura.loc[faktura["ProTime-Datum"] == day, "Erfasste Menge"].sum() / 8
+        )
+        actual_cum.append(total)
+
+    available = calendar["available"].tolist()
+    ideal_values, cumulative, remaining_target = [], 0.0, float(target)
+    for i in range(len(all_days)):
+        if available[i]:
+            remaining_available = sum(available[i:])
+            increment = remaining_target / remaining_available
+            cumulative += increment
+            remaining_target -= increment
+        ideal_values.append(cumulative)
+
+    last_fact_date = df_daily["ProTime-Datum"].max().date()
+    rows = []
+    for day, is_holiday, is_urlaub, is_krank, is_weekend in zip(
+        all_days,
+        calendar["holiday"],
+        calendar["urlaub"],
+        calendar["krank"],
+        calendar["weekend"],
+    ):
+        if is_holiday:
+            d_type, color = "Feiertag", "grey"
+        elif is_urlaub:
+            d_type, color = "Urlaub", "orange"
+        elif is_krank:
+            d_type, color = "Krankheit", "purple"
+        elif is_weekend:
+            d_type, color = "Wochenende", "green"
+        else:
+            d_type, color = "normal", "#1f77b4"
+        opacity = 1 if d_type == "normal" else 0.6
+        if day.date() > last_fact_date:
+            opacity = 0.4
+        group = "Arbeitstag" if d_type == "normal" else d_type
+        rows.append((d_type, color, opacity, group))
+    return actual_cum, ideal_values, rows
+
+
+def test_burndown_matches_loop_reference(daily, absences):
+    from charts.burndown_bar import processing
+    from common import workdays
+
+    calendar = workdays.build_calendar(START, END, absences)
+    all_days, actual_cum, ideal_values, df_bar = processing.get_burndown_data(
+        daily, calendar, START, END, target=12.5
+    )
+    actual_ref, ideal_ref, rows_ref = _reference(daily, calendar, START, END, 12.5)
+
+    assert len(all_days) == len(ideal_ref)
+    assert actual_cum.to_numpy() == pytest.approx(actual_ref, abs=1e-12)
+    assert np.asarray(ideal_values) == pytest.approx(ideal_ref, abs=1e-9)
+    assert ideal_values[-1] == pytest.approx(12.5)
+    assert (
+        list(
+            df_bar[["day_type", "color", "opacity", "group"]].itertuples(
+                index=False, name=None
+            )
+        )
+        == rows_ref
+    )
+    # Der Zeitraum enthält alle Tagesarten
+    assert {row[0] for row in rows_ref} == {
+        "Feiertag",
+        "Urlaub",
+        "Krankheit",
+        "Wochenende",
+        "normal",
+    }
@@ -0,0 +1,31 @@
+def test_results_are_shared_between_processes(dataset_key, monkeypatch):
+    from common import compute, data
+
+    compute.clear()
+    expected = compute.project_totals(dataset_key, "2024-04-01", "2025-03-31")
+
+    # Ein anderer Prozess hat nur den gemeinsamen Cache, nicht _results
+    compute._results.clear()
+
+    def recompute(*args, **kwargs):
+        raise AssertionError("Zwischenergebnis wurde erneut berechnet")
+
+    monkeypatch.setattr(data, "filter_data_by_date", recompute)
+    result = compute.project_totals(dataset_key, "2024-04-01", "2025-03-31")
+    assert result.equals(expected)
+
+
+def test_available_days_match_dataset_helpers(dataset_key):
+    from common import compute, data, store
+
+    dataset = store.get_dataset(dataset_key)
+    for start_date, end_date in [
+        ("2024-04-01", "2025-03-31"),
+        ("2024-06-01", "2024-06-30"),
+    ]:
+        assert compute.remaining_available_days(
+            dataset_key, start_date, end_date
+        ) == data.remaining_available_days(dataset, start_date, end_date)
+        assert compute.fiscal_year_available_days(
+            dataset_key, start_date
+        ) == data.fiscal_year_available_days(dataset, start_date)
@@ -0,0 +1,31 @@
+import pytest
+
+
+def test_daily_cube_keeps_totals_of_split_general_hours(export):
+    from common import data
+
+    dataset = data.import_data(export)
+    cube = dataset["daily"]
+    assert (export["Kurztext"] == "Stunden - CONET Solutions GmbH").any()
+
+    # Die Stunden im Export sind Viertelstunden; das Aufteilen der
+    # Allgemein-Stunden auf Projekte darf an den Summen nichts ändern
+    assert cube["Erfasste Menge"].sum() == pytest.approx(
+        export["Erfasste Menge"].sum(), abs=1e-9
+    )
+    by_day = cube.groupby("ProTime-Datum")["Erfasste Menge"].sum()
+    expected = export.groupby("ProTime-Datum")["Erfasste Menge"].sum()
+    assert by_day.to_numpy() == pytest.approx(expected.to_numpy(), abs=1e-9)
+
+
+def test_dataset_is_compact(export):
+    from common import data
+
+    dataset = data.import_data(export)
+    assert set(dataset) == {"daily", "absences"}
+    dtypes = dataset["daily"].dtypes
+    assert dtypes["Auftrag/Projekt/Kst."] == "category"
+    assert dtypes["Kurztext"] == "category"
+    assert dtypes["Klasse"] == "int8"
+    assert dtypes["Erfasste Menge"] == "float64"
+    assert dtypes["ProTime-Datum"] == "datetime64[ns]"
@@ -0,0 +1,98 @@
+def _dispatch(client, output, outputs, inputs, state):
+    return client.post(
+        "/_dash-update-component",
+        json={
+            "output": output,
+            "outputs": outputs,
+            "inputs": inputs,
+            "state": state,
+            "changedPropIds": ["data-all.data"],
+        },
+    )
+
+
+def _refresh_interval_data(client, dataset_key):
+    """
+    Callback des Stores interval-bar-data nach "Aktualisieren" im Dashboard.
+    """
+    response = _dispatch(
+        client,
+        "interval-bar-data.data",
+        {"id": "interval-bar-data", "property": "data"},
+        [
+            {"id": "update-date-range", "property": "n_clicks", "value": 1},
+            {"id": "data-all", "property": "data", "value": dataset_key},
+        ],
+        [
+            {
+                "id": "date-picker-range",
+                "property": "start_date",
+                "value": "2024-04-01",
+            },
+            {"id": "date-picker-range", "property": "end_date", "value": "2025-03-31"},
+            {"id": "session-id", "property": "data", "value": None},
+        ],
+    )
+    assert response.status_code == 200
+
+
+def test_store_payloads_are_counted(client, dataset_key):
+    _refresh_interval_data(client, dataset_key)
+
+    lines = client.get("/metrics").get_data(as_text=True).splitlines()
+    writes = [
+        line
+        for line in lines
+        if line.startswith("faktura_store_payloads_total")
+        and 'store="interval-bar-data"' in line
+    ]
+    assert writes and float(writes[0].rsplit(" ", 1)[1]) >= 1
+
+
+def _value(lines, prefix):
+    return float(
+        next(line for line in lines if line.startswith(prefix)).rsplit(" ", 1)[1]
+    )
+
+
+def test_metrics_are_summed_across_workers(client, dataset_key):
+    import json
+    import os
+
+    from common import metrics
+
+    _refresh_interval_data(client, dataset_key)
+    metrics.flush()
+    own = os.path.join(metrics._directory(), f"{os.getpid()}.json")
+    with open(own) as file:
+        payload = json.load(file)
+    before = client.get("/metrics").get_data(as_text=True).splitlines()
+
+    # Zweiter Worker desselben Masters, der denselben Stand gezählt hat
+    other = os.path.join(metrics._directory(), "999999999.json")
+    with open(other, "w") as file:
+        json.dump(payload, file)
+    # Überbleibsel eines früheren Starts
+    stale = os.path.join(metrics._directory(), "999999998.json")
+    with open(stale, "w") as file:
+        json.dump({**payload, "parent": [0, None]}, file)
+    try:
+        after = client.get("/metrics").get_data(as_text=True).splitlines()
+    finally:
+        os.remove(other)
+
+    prefix = 'faktura_store_payloads_total{store="interval-bar-data"}'
+    assert _value(after, prefix) == 2 * _value(before, prefix)
+    assert not os.path.exists(stale)
+
+
+def test_figure_cache_is_exposed(client, dataset_key):
+    from common import charts
+
+    _refresh_interval_data(client, dataset_key)
+    stats = charts.cache_stats()
+    lines = client.get("/metrics").get_data(as_text=True).splitlines()
+    for name in ("hits_total", "misses_total", "entries", "bytes"):
+        value = _value(lines, f"faktura_figure_cache_{name} ")
+        assert value == stats[name.removesuffix("_total")]
+    assert stats["hits"] + stats["misses"] >= 1 and stats["entries"] >= 1
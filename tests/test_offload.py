@@ -0,0 +1,13 @@
+import time
+
+
+def test_generations_count_up_and_expire():
+    from common import offload
+
+    first = offload.next_generation("tab", "chart")
+    assert offload.next_generation("tab", "chart") == first + 1
+    assert offload.is_current("tab", "chart", first + 1)
+
+    _, expire_time = offload._generations.get(("tab", "chart"), expire_time=True)
+    assert expire_time is not None
+    assert expire_time <= time.time() + offload.GENERATION_EXPIRE
@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.fixture
+def profiling_config(monkeypatch):
+    from common import config
+
+    settings = {"profiling": True, "profiling_token": "geheim"}
+    original = config.get
+    monkeypatch.setattr(
+        config,
+        "get",
+        lambda name, default=None: settings.get(name, original(name, default)),
+    )
+
+
+def test_profiles_require_token(client, profiling_config):
+    assert client.get("/profiles").status_code == 404
+    assert client.get("/profiles?profile=1").status_code == 404
+    assert client.get("/profiles/x.txt").status_code == 404
+
+    assert (
+        client.get("/profiles", headers={"X-Faktura-Profile": "geheim"}).status_code
+        == 200
+    )
+    assert client.get("/profiles?profile=geheim").status_code == 200
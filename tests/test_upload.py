@@ -0,0 +1,41 @@
+import base64
+
+
+def _upload_output():
+    import app
+
+    return next(
+        output for output in app.app.callback_map if "upload-pending.data" in output
+    )
+
+
+def _check_upload(client, raw):
+    output = _upload_output()
+    contents = "data:application/octet-stream;base64," + base64.b64encode(raw).decode()
+    return client.post(
+        "/_dash-update-component",
+        json={
+            "output": output,
+            "outputs": [
+                dict(zip(("id", "property"), part.split(".", 1)))
+                for part in output.strip(".").split("...")
+            ],
+            "inputs": [
+                {"id": "upload-data", "property": "contents", "value": contents}
+            ],
+            "changedPropIds": ["upload-data.contents"],
+        },
+    )
+
+
+def test_repeated_upload_is_answered_without_job(client, dataset_key):
+    # Der Test-Datensatz liegt unter dem Schlüssel von b"tests" (siehe conftest)
+    response = _check_upload(client, b"tests")
+    assert response.status_code == 200
+    assert response.json["response"] == {"data-all": {"data": dataset_key}}
+
+
+def test_new_upload_starts_job(client):
+    response = _check_upload(client, b"noch nicht hochgeladen")
+    assert response.status_code == 200
+    assert list(response.json["response"]) == ["upload-pending"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+
+def _absences(**days):
+    return pd.DataFrame(
+        {
+            "ProTime-Datum": pd.to_datetime(list(days.values())),
+            "Positionsbezeichnung": list(days.keys()),
+        }
+    )
+
+
+def test_calendar_day_types():
+    from common import workdays
+
+    absences = _absences(Urlaub="2024-12-23", Krank="2024-12-27")
+    calendar = workdays.build_calendar("2024-12-21", "2025-01-02", absences)
+    day = calendar.loc
+
+    assert day["2024-12-21", "weekend"] and not day["2024-12-21", "available"]
+    # Feiertage in NRW
+    for holiday in ("2024-12-25", "2024-12-26", "2025-01-01"):
+        assert day[holiday, "holiday"] and not day[holiday, "available"]
+        assert day[holiday, "soll_hours"] == 0
+    # Urlaub und Krankheit nehmen den Tag aus, die Sollstunden bleiben
+    assert day["2024-12-23", "urlaub"] and not day["2024-12-23", "available"]
+    assert day["2024-12-27", "krank"] and not day["2024-12-27", "available"]
+    assert day["2024-12-23", "soll_hours"] == 8
+    # Halbe Arbeitstage
+    assert day["2024-12-24", "available"] and day["2024-12-24", "soll_hours"] == 4
+    assert day["2024-12-30", "soll_hours"] == 8
+
+
+def test_half_day_end_of_fiscal_year():
+    from common import workdays
+
+    calendar = workdays.build_calendar("2025-03-31", "2025-03-31")
+    assert calendar["soll_hours"].tolist() == [4]
+
+
+def test_regional_holiday():
+    from common import workdays
+
+    # Fronleichnam ist in NRW ein Feiertag, nicht aber z. B. in Berlin
+    fronleichnam = np.datetime64("2024-05-30")
+    assert fronleichnam in workdays.holiday_days("2024-05-01", "2024-05-31")
+    assert fronleichnam not in workdays.holidays_for_year(2024, "BE")
+
+
+def test_available_days_exclude_holidays():
+    from common import data
+
+    # Früher wurden Feiertage hier nie abgezogen: 23.–27.12. hat zwei davon
+    assert data.get_available_days(_absences(), "2024-12-23", "2024-12-27") == 3
+    assert (
+        data.get_available_days(
+            _absences(Urlaub="2024-12-23"), "2024-12-23", "2024-12-27"
+        )
+        == 2
+    )